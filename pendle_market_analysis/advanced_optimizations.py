@@ -5,6 +5,7 @@ Provides intelligent fallbacks, data diversification, and smart sampling
 """
 
 import asyncio
+import logging
 import random
 import time
 from collections import defaultdict, deque
@@ -16,6 +17,8 @@ import json
 
 from pendle_market_analysis.models import Market, Transaction, PendleApiError
 
+logger = logging.getLogger(__name__)
+
 
 class MarketTier(Enum):
     """Market classification for optimization strategies"""
@@ -124,9 +127,11 @@ class AdvancedMarketAnalyzer:
     
     async def get_transactions_with_optimization(self, 
                                                market: Market,
-                                               base_strategy: Optional[OptimizationStrategy] = None) -> List[Transaction]:
+                                               base_strategy: Optional[OptimizationStrategy] = None,
+                                               session=None) -> List[Transaction]:
         """
-        Get transactions using intelligent optimization and fallbacks
+        Get transactions using intelligent optimization and fallbacks.
+        Requests go through `session` when given, else the API client's own session.
         """
         market_address = market.address
         tier = self.classify_market_tier(market_address)
@@ -134,11 +139,11 @@ class AdvancedMarketAnalyzer:
         # Use provided strategy or get tier-based strategy
         strategy = base_strategy or self.OPTIMIZATION_STRATEGIES[tier]
         
-        print(f"    🎯 Using {tier.value} strategy: {strategy.name}")
+        logger.debug("    🎯 Using %s strategy: %s", tier.value, strategy.name)
         
         # Try main strategy first
         transactions = await self._try_transaction_collection(
-            market, strategy, DataSource.MAIN_TRANSACTIONS
+            market, strategy, DataSource.MAIN_TRANSACTIONS, session
         )
         
         if len(transactions) >= self.VOLUME_THRESHOLDS[MarketTier.LOW_VOLUME]:
@@ -149,11 +154,11 @@ class AdvancedMarketAnalyzer:
         fallback_sources = self._get_fallback_sources(tier)
         
         for fallback_source in fallback_sources:
-            print(f"    🔄 Trying fallback: {fallback_source.value}")
+            logger.debug("    🔄 Trying fallback: %s", fallback_source.value)
             
             fallback_strategy = self._adapt_strategy_for_source(strategy, fallback_source)
             transactions = await self._try_transaction_collection(
-                market, fallback_strategy, fallback_source
+                market, fallback_strategy, fallback_source, session
             )
             
             if len(transactions) >= self.VOLUME_THRESHOLDS[MarketTier.LOW_VOLUME]:
@@ -211,23 +216,26 @@ class AdvancedMarketAnalyzer:
     async def _try_transaction_collection(self, 
                                         market: Market,
                                         strategy: OptimizationStrategy,
-                                        data_source: DataSource) -> List[Transaction]:
+                                        data_source: DataSource,
+                                        session=None) -> List[Transaction]:
         """Attempt transaction collection with specific strategy"""
         try:
             if data_source == DataSource.PRICE_DATA:
                 return await self._get_price_based_transactions(market, strategy)
             else:
-                return await self._get_optimized_transactions(market, strategy, data_source)
+                return await self._get_optimized_transactions(market, strategy, data_source, session)
         except Exception as e:
-            print(f"    ⚠️ Strategy {strategy.name} failed: {e}")
+            logger.warning("    ⚠️ Strategy %s failed: %s", strategy.name, e)
             return []
     
     async def _get_optimized_transactions(self,
                                         market: Market,
                                         strategy: OptimizationStrategy,
-                                        data_source: DataSource) -> List[Transaction]:
+                                        data_source: DataSource,
+                                        session=None) -> List[Transaction]:
         """Get transactions using optimized parameters"""
-        session = await self.api_client.get_session()
+        if session is None:
+            session = await self.api_client.get_session()
         
         # Set up optimized parameters
         params = {
@@ -267,7 +275,7 @@ class AdvancedMarketAnalyzer:
                     endpoint="v4/transactions"
                 )
             except Exception as e:
-                print(f"    ⚠️ Page {pages + 1} failed: {e}")
+                logger.warning("    ⚠️ Page %s failed: %s", pages + 1, e)
                 break
             
             page = data.get('results', [])
@@ -326,14 +334,14 @@ class AdvancedMarketAnalyzer:
             if not resume_token:
                 skip += len(page)
         
-        print(f"    📊 Collected {len(transactions)} transactions using {data_source.value}")
+        logger.debug("    📊 Collected %s transactions using %s", len(transactions), data_source.value)
         return transactions
     
     async def _get_price_based_transactions(self, 
                                           market: Market, 
                                           strategy: OptimizationStrategy) -> List[Transaction]:
         """Create synthetic transactions from price data as last resort"""
-        print(f"    💰 Using price-based estimation for {market.name}")
+        logger.debug("    💰 Using price-based estimation for %s", market.name)
         
         # This would typically involve getting price data and creating
         # synthetic transaction points based on price movements
@@ -4,13 +4,18 @@ Basic Pendle Market Analyzer
 Core analysis functionality for decline rate calculations
 """
 
+import heapq
 import math
 from collections import defaultdict
 from datetime import datetime, timedelta, timezone
-from typing import Dict, List, Optional, Tuple
+from operator import attrgetter
+from typing import Any, Dict, List, Optional, Tuple
 
 from pendle_market_analysis.models import Market, Transaction, DeclineRateAnalysis
 
+# C-level sort key; avoids a Python frame per comparison
+_TS_KEY = attrgetter('timestamp')
+
 
 class PendleAnalyzer:
     """Basic analyzer for Pendle market decline rate analysis"""
@@ -18,14 +23,34 @@ class PendleAnalyzer:
     def __init__(self, api_client):
         self.api_client = api_client
     
+    @staticmethod
+    def _decline_rates_from_daily_averages(daily_averages: Dict[Any, float]) -> Tuple[float, float]:
+        """Average and latest day-over-day change (%) from per-day average APYs"""
+        if len(daily_averages) < 2:
+            return 0.0, 0.0
+        
+        dates = sorted(daily_averages.keys())
+        daily_rates = []
+        
+        for i in range(1, len(dates)):
+            prev_avg = daily_averages[dates[i-1]]
+            curr_avg = daily_averages[dates[i]]
+            
+            if prev_avg > 0:
+                daily_rates.append((curr_avg - prev_avg) / prev_avg * 100)
+        
+        if not daily_rates:
+            return 0.0, 0.0
+        
+        return sum(daily_rates) / len(daily_rates), daily_rates[-1]
+    
     def calculate_current_yt_price_fast(self, transactions: List[Transaction]) -> float:
         """Calculate current YT price from recent transactions"""
         if not transactions:
             return 0.0
         
-        # Sort by timestamp and get most recent transactions
-        sorted_txs = sorted(transactions, key=lambda x: x.timestamp, reverse=True)
-        recent_txs = sorted_txs[:10]  # Last 10 transactions
+        # Get most recent transactions without sorting the full list
+        recent_txs = heapq.nlargest(10, transactions, key=_TS_KEY)  # Last 10 transactions
         
         # Calculate average implied APY from recent transactions
         valid_apy_values = [tx.implied_apy for tx in recent_txs if tx.implied_apy is not None]
@@ -60,7 +85,7 @@ class PendleAnalyzer:
             return 0.0, 0.0
         
         # Sort by timestamp
-        sorted_txs = sorted(transactions, key=lambda x: x.timestamp)
+        sorted_txs = sorted(transactions, key=_TS_KEY)
         
         # Group by date and calculate daily implied APY
         daily_data = defaultdict(list)
@@ -73,25 +98,6 @@ class PendleAnalyzer:
             except:
                 continue
         
-        if len(daily_data) < 2:
-            return 0.0, 0.0
-        
-        # Calculate daily rates of change
-        dates = sorted(daily_data.keys())
-        daily_rates = []
-        
-        for i in range(1, len(dates)):
-            prev_avg = sum(daily_data[dates[i-1]]) / len(daily_data[dates[i-1]])
-            curr_avg = sum(daily_data[dates[i]]) / len(daily_data[dates[i]])
-            
-            if prev_avg > 0:
-                rate_change = (curr_avg - prev_avg) / prev_avg * 100
-                daily_rates.append(rate_change)
-        
-        if not daily_rates:
-            return 0.0, 0.0
-        
-        avg_decline = sum(daily_rates) / len(daily_rates)
-        latest_decline = daily_rates[-1] if daily_rates else 0.0
-        
-        return avg_decline, latest_decline
\ No newline at end of file
+        return self._decline_rates_from_daily_averages({
+            tx_date: sum(values) / len(values) for tx_date, values in daily_data.items()
+        })
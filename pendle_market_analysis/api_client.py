@@ -7,6 +7,7 @@ Enhanced with advanced rate limiting, caching, batching, and monitoring
 import asyncio
 import hashlib
 import json
+import logging
 import os
 import random
 import time
@@ -18,7 +19,20 @@ from pathlib import Path
 from typing import Dict, List, Optional, Any, Tuple
 import aiohttp
 
-from pendle_market_analysis.models import Market, Transaction, PendleApiError
+from pendle_market_analysis.models import Market, Transaction, DeclineRateAnalysis, PendleApiError
+
+logger = logging.getLogger(__name__)
+
+# aiohttp only decodes Brotli responses when a brotli package is importable
+try:
+    import brotli  # noqa: F401
+    _ACCEPT_ENCODING = "gzip, deflate, br"
+except ImportError:
+    try:
+        import brotlicffi  # noqa: F401
+        _ACCEPT_ENCODING = "gzip, deflate, br"
+    except ImportError:
+        _ACCEPT_ENCODING = "gzip, deflate"
 
 
 @dataclass
@@ -44,6 +58,7 @@ class RateLimitState:
         self.request_times: deque = deque(maxlen=100)  # Track last 100 requests
         self.rate_limit_violations: deque = deque(maxlen=50)  # Track rate limit violations
         self.adaptive_cooldown: float = 0.0  # Additional cooldown based on violations
+        self.cooldown_until: float = 0.0  # Epoch time before which no new work should start
         self.last_reset_date: date = datetime.now().date()
     
     def can_make_request(self, endpoint: str = "", computing_units: int = 1) -> bool:
@@ -95,6 +110,16 @@ class RateLimitState:
         if retry_after:
             self.adaptive_cooldown = max(self.adaptive_cooldown, retry_after)
     
+    def start_cooldown(self, seconds: float):
+        """Hold back new requests for the given number of seconds after a 429/503"""
+        self.cooldown_until = max(self.cooldown_until, time.time() + seconds)
+    
+    async def wait_if_cooling(self):
+        """Sleep until any active cooldown has passed"""
+        remaining = self.cooldown_until - time.time()
+        if remaining > 0:
+            await asyncio.sleep(remaining)
+    
     def get_recommended_delay(self) -> float:
         """Get recommended delay before next request based on current state"""
         now = time.time()
@@ -133,6 +158,7 @@ class RateLimitState:
             'computing_unit_budget_remaining': self.computing_unit_budget,
             'recent_rate_limit_violations': len(recent_violations),
             'adaptive_cooldown': self.adaptive_cooldown,
+            'cooldown_remaining': max(0.0, self.cooldown_until - now),
             'requests_in_last_second': len([t for t in self.request_times if now - t < 1.0]),
             'last_reset_date': self.last_reset_date.isoformat()
         }
@@ -191,12 +217,27 @@ class PendleAPIClientOptimized:
         "sdk": 5            # SDK endpoints
     }
     
+    # Default request headers for every session talking to the Pendle API
+    DEFAULT_HEADERS = {
+        'User-Agent': 'PendleMarketAnalysis/2.0',
+        'Accept': 'application/json',
+        'Accept-Encoding': _ACCEPT_ENCODING
+    }
+    
+    # Timed-out requests get a small retry budget of their own: each attempt can take the
+    # full session timeout, so the general max_retries would keep a market slot busy for minutes
+    MAX_TIMEOUT_RETRIES = 1
+    
     # Cache TTL settings (in seconds)
     CACHE_TTL = {
         "markets": 1800,  # 30 minutes
         "transactions": 300,  # 5 minutes
         "prices": 60,  # 1 minute
-        "assets": 3600  # 1 hour
+        "assets": 3600,  # 1 hour
+        "collected_transactions": 3600,  # 1 hour
+        "latest_transaction": 60,  # 1 minute
+        "analysis": 21600,  # 6 hours; bounds drift of the time-relative analysis window
+        "tx_counts": 604800  # 1 week; only used to order market scheduling
     }
     
     def __init__(self, chain_id: int = 1, enable_cache: bool = True,
@@ -298,10 +339,65 @@ class PendleAPIClientOptimized:
                 'ttl_seconds': ttl
             }
             with open(cache_path, 'w') as f:
-                json.dump(cache_data, f, indent=2)
+                json.dump(cache_data, f, separators=(',', ':'))
         except OSError:
             pass  # Handle disk cache errors gracefully
     
+    def _collected_transactions_key(self, market_addr: str) -> str:
+        """Cache key for a market's collected transactions (one file per market, TTL decides freshness)"""
+        return f"collected_{self.chain_id}_{market_addr}"
+    
+    def get_cached_transactions(self, market_addr: str) -> Optional[List[Transaction]]:
+        """Return a market's collected transactions if they were cached within the TTL"""
+        cached = self._load_from_cache(self._collected_transactions_key(market_addr))
+        if cached is None:
+            return None
+        try:
+            return [Transaction.from_dict(tx) for tx in cached]
+        except (TypeError, KeyError):
+            return None  # Entry written by an incompatible version
+    
+    def cache_transactions(self, market_addr: str, transactions: List[Transaction]):
+        """Cache a market's collected transactions until the end of the TTL"""
+        self._save_to_cache(
+            self._collected_transactions_key(market_addr),
+            [tx.to_dict() for tx in transactions],
+            "collected_transactions"
+        )
+    
+    def _analysis_key(self, market_addr: str) -> str:
+        """Cache key for a market's latest analysis; the entry records the fingerprint it was built for"""
+        return f"analysis_{self.chain_id}_{market_addr}"
+    
+    def get_cached_analysis(self, market: Market, fingerprint: str) -> Optional[DeclineRateAnalysis]:
+        """Return a previous analysis of the market if its latest transaction is unchanged"""
+        cached = self._load_from_cache(self._analysis_key(market.address))
+        if not isinstance(cached, dict) or cached.get('fingerprint') != fingerprint:
+            return None
+        try:
+            return DeclineRateAnalysis.from_dict(market, cached['analysis'])
+        except (TypeError, KeyError):
+            return None  # Entry written by an incompatible version
+    
+    def cache_analysis(self, fingerprint: str, analysis: DeclineRateAnalysis):
+        """Remember a successful analysis under the market's latest-transaction fingerprint"""
+        self._save_to_cache(
+            self._analysis_key(analysis.market.address),
+            {'fingerprint': fingerprint, 'analysis': analysis.to_dict()},
+            "analysis"
+        )
+    
+    def get_prior_tx_counts(self) -> Dict[str, int]:
+        """Transaction counts per market address recorded by earlier runs on this chain"""
+        cached = self._load_from_cache(f"tx_counts_{self.chain_id}")
+        return cached if isinstance(cached, dict) else {}
+    
+    def save_prior_tx_counts(self, tx_counts: Dict[str, int]):
+        """Merge this run's per-market transaction counts into the recorded ones"""
+        if tx_counts:
+            merged = {**self.get_prior_tx_counts(), **tx_counts}
+            self._save_to_cache(f"tx_counts_{self.chain_id}", merged, "tx_counts")
+    
     def _get_computing_units(self, endpoint: str) -> int:
         """Get computing units cost for an endpoint"""
         for key, cost in self.COMPUTING_UNIT_COSTS.items():
@@ -341,6 +437,7 @@ class PendleAPIClientOptimized:
         full_url = f"{url}?{query_string}" if query_string else url
         
         last_exception = None
+        timeout_retries = 0
         
         for retry_count in range(max_retries + 1):
             try:
@@ -365,7 +462,7 @@ class PendleAPIClientOptimized:
                         
                         return data
                         
-                    elif response.status == 429:
+                    elif response.status in (429, 503):
                         self.metrics.rate_limited += 1
                         
                         # Parse retry-after header if available
@@ -378,14 +475,24 @@ class PendleAPIClientOptimized:
                             delay = (self.BASE_DELAY_MS / 1000) * (2 ** retry_count) + random.uniform(0, 0.5)
                             self.rate_limiter.record_rate_limit_violation()
                         
-                        print(f"    ⏱️ Rate limited (429), retrying in {delay:.1f}s...")
+                        self.rate_limiter.start_cooldown(delay)
+                        logger.warning("    ⏱️ Rate limited (%d), retrying in %.1fs...", response.status, delay)
                         await asyncio.sleep(delay)
                         continue
                         
                     else:
                         # Use enhanced error handling with detailed information
-                        raise PendleApiError.from_response(response, endpoint)
+                        raise await PendleApiError.from_response(response, endpoint)
                         
+            except asyncio.TimeoutError as e:
+                # Checked before ClientError: aiohttp's ServerTimeoutError is both
+                last_exception = e
+                if timeout_retries < self.MAX_TIMEOUT_RETRIES and retry_count < max_retries:
+                    timeout_retries += 1
+                    logger.warning("    ⏱️ Request timed out, retrying (%d/%d)...",
+                                   timeout_retries, self.MAX_TIMEOUT_RETRIES)
+                    continue
+                raise PendleApiError(f"Request timed out after {timeout_retries} retries: {endpoint or url}")
             except aiohttp.ClientError as e:
                 last_exception = e
                 if retry_count < max_retries:
@@ -417,10 +524,7 @@ class PendleAPIClientOptimized:
             self._session = aiohttp.ClientSession(
                 connector=connector,
                 timeout=timeout,
-                headers={
-                    'User-Agent': 'PendleMarketAnalysis/2.0',
-                    'Accept': 'application/json'
-                }
+                headers=self.DEFAULT_HEADERS
             )
         
         return self._session
@@ -483,14 +587,14 @@ class PendleAPIClientOptimized:
         """Log a comprehensive performance summary"""
         metrics = self.get_api_metrics()
         
-        print(f"\n📊 API Performance Summary for {metrics['configuration']['chain_name']}:")
-        print(f"  Requests: {metrics['request_metrics']['total_requests']}")
-        print(f"  Cache Hit Rate: {metrics['request_metrics']['cache_hit_rate']:.2%}")
-        print(f"  Avg Response Time: {metrics['request_metrics']['avg_response_time']:.3f}s")
-        print(f"  Rate Limited: {metrics['request_metrics']['rate_limited']}")
-        print(f"  Efficiency Score: {metrics['performance_indicators']['efficiency_score']:.3f}/1.0")
-        print(f"  Computing Units Remaining: {metrics['rate_limit_metrics']['computing_unit_budget_remaining']}")
-        print(f"  Active Rate Limit Violations: {metrics['rate_limit_metrics']['recent_rate_limit_violations']}")
+        logger.info("\n📊 API Performance Summary for %s:", metrics['configuration']['chain_name'])
+        logger.info("  Requests: %s", metrics['request_metrics']['total_requests'])
+        logger.info("  Cache Hit Rate: %.2f%%", metrics['request_metrics']['cache_hit_rate'] * 100)
+        logger.info("  Avg Response Time: %.3fs", metrics['request_metrics']['avg_response_time'])
+        logger.info("  Rate Limited: %s", metrics['request_metrics']['rate_limited'])
+        logger.info("  Efficiency Score: %.3f/1.0", metrics['performance_indicators']['efficiency_score'])
+        logger.info("  Computing Units Remaining: %s", metrics['rate_limit_metrics']['computing_unit_budget_remaining'])
+        logger.info("  Active Rate Limit Violations: %s", metrics['rate_limit_metrics']['recent_rate_limit_violations'])
     
     def validate_cache_keys(self) -> Dict[str, bool]:
         """Validate cache key generation for all relevant endpoints"""
@@ -519,7 +623,7 @@ class PendleAPIClientOptimized:
     
     async def get_active_markets(self, session: Optional[aiohttp.ClientSession] = None) -> List[Market]:
         """Enhanced market fetching with caching and optimization"""
-        print(f"🔍 Fetching active markets for {self.chain_name}...")
+        logger.info("🔍 Fetching active markets for %s...", self.chain_name)
         
         if session is None:
             session = await self.get_session()
@@ -550,16 +654,16 @@ class PendleAPIClientOptimized:
                 )
                 markets.append(market)
             
-            print(f"📊 Found {len(markets)} active markets")
+            logger.info("📊 Found %s active markets", len(markets))
             return markets
             
         except Exception as e:
-            print(f"❌ Failed to get active markets: {e}")
+            logger.error("❌ Failed to get active markets: %s", e)
             raise PendleApiError(f"Failed to get active markets: {e}")
     
     async def batch_get_transactions(self, market_addresses: List[str]) -> Dict[str, List[Transaction]]:
         """Batch fetch transactions for multiple markets efficiently"""
-        print(f"🔄 Batch fetching transactions for {len(market_addresses)} markets...")
+        logger.info("🔄 Batch fetching transactions for %s markets...", len(market_addresses))
         
         if not market_addresses:
             return {}
@@ -575,7 +679,7 @@ class PendleAPIClientOptimized:
                     transactions = await self.get_transactions(session, market_addr)
                     return market_addr, transactions
                 except Exception as e:
-                    print(f"    ⚠️ Failed to fetch transactions for {market_addr[:10]}: {e}")
+                    logger.warning("    ⚠️ Failed to fetch transactions for %s: %s", market_addr[:10], e)
                     return market_addr, []
         
         # Execute batch requests
@@ -589,13 +693,13 @@ class PendleAPIClientOptimized:
                 market_addr, transactions = result
                 transaction_data[market_addr] = transactions
         
-        print(f"✅ Completed batch fetch for {len(transaction_data)} markets")
+        logger.info("✅ Completed batch fetch for %s markets", len(transaction_data))
         return transaction_data
     
     async def get_transactions(self, session: aiohttp.ClientSession, market_addr: str,
                              use_advanced_filters: bool = True) -> List[Transaction]:
         """Enhanced transaction fetching with advanced optimization"""
-        print(f"  📈 Fetching optimized transactions for {market_addr[:10]}...")
+        logger.info("  📈 Fetching optimized transactions for %s...", market_addr[:10])
         
         base = f"{self.BASE_URL}/v4/{self.chain_id}/transactions"
         results = []
@@ -635,7 +739,7 @@ class PendleAPIClientOptimized:
                     cache_ttl_category="transactions"
                 )
             except Exception as e:
-                print(f"    ⚠️ Failed to fetch page {pages + 1}: {e}")
+                logger.warning("    ⚠️ Failed to fetch page %s: %s", pages + 1, e)
                 break
             
             page = data.get('results', [])
@@ -694,11 +798,11 @@ class PendleAPIClientOptimized:
             
             results.extend(page_transactions)
             pages += 1
-            print(f"    📄 Page {pages}: {len(page_transactions)} filtered transactions")
+            logger.debug("    📄 Page %s: %s filtered transactions", pages, len(page_transactions))
             
             # Early termination with better logic
             if len(results) >= self.TRANSACTION_LIMIT_RECENT:
-                print(f"    ✅ Reached transaction limit ({len(results)} transactions)")
+                logger.debug("    ✅ Reached transaction limit (%s transactions)", len(results))
                 break
             
             # Adaptive pagination pause
@@ -709,15 +813,37 @@ class PendleAPIClientOptimized:
                 # Adaptive delay based on response time
                 await asyncio.sleep(self.BASE_DELAY_MS / 1000)
         
-        print(f"    🔄 Final: {len(results)} unique, recent transactions")
+        logger.info("    🔄 Final: %s unique, recent transactions", len(results))
         return results
     
+    async def get_latest_transaction_fingerprint(self, session: aiohttp.ClientSession,
+                                                 market_addr: str) -> Optional[str]:
+        """Identify a market's newest transaction ("id:timestamp") with a single-row request"""
+        endpoint = f"v4/{self.chain_id}/transactions"
+        params = {
+            "market": market_addr,
+            "limit": "1",
+            "action": "SWAP_PT,SWAP_PY,SWAP_YT",
+            "origin": "PENDLE_MARKET,YT"
+        }
+        data = await self._make_request_with_retry(
+            session, f"{self.BASE_URL}/{endpoint}", params,
+            endpoint=endpoint,
+            cache_ttl_category="latest_transaction"
+        )
+        
+        page = data.get('results', [])
+        if not page:
+            return None
+        latest = page[0]
+        return f"{latest.get('id', '')}:{latest.get('timestamp', '')}"
+    
     async def get_asset_prices_batch(self, asset_ids: List[str]) -> Dict[str, Any]:
         """Batch fetch asset prices efficiently"""
         if not asset_ids:
             return {}
         
-        print(f"💰 Fetching prices for {len(asset_ids)} assets...")
+        logger.info("💰 Fetching prices for %s assets...", len(asset_ids))
         
         session = await self.get_session()
         
@@ -748,10 +874,10 @@ class PendleAPIClientOptimized:
                 price_data.update(prices)
                 
             except Exception as e:
-                print(f"    ⚠️ Failed to fetch price batch {i//batch_size + 1}: {e}")
+                logger.warning("    ⚠️ Failed to fetch price batch %s: %s", i//batch_size + 1, e)
                 continue
         
-        print(f"✅ Retrieved prices for {len(price_data)} assets")
+        logger.info("✅ Retrieved prices for %s assets", len(price_data))
         return price_data
     
     def get_metrics_summary(self) -> Dict[str, Any]:
@@ -5,20 +5,26 @@ Integrates intelligent fallbacks and smart data collection
 """
 
 import asyncio
+import logging
 import math
 import random
-from collections import defaultdict
-from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
-from typing import Dict, List, Optional, Any, Tuple
+from operator import attrgetter
+from typing import Dict, List, NamedTuple, Optional, Any, Tuple
 
 from pendle_market_analysis.models import Market, Transaction, DeclineRateAnalysis, PendleApiError
 from pendle_market_analysis.analyzer import PendleAnalyzer
 from pendle_market_analysis.advanced_optimizations import AdvancedMarketAnalyzer, MarketTier, OptimizationStrategy
 
+logger = logging.getLogger(__name__)
 
-@dataclass 
-class AnalysisStrategy:
+_TS_KEY = attrgetter('timestamp')
+
+# Dedicated generator for transaction sampling, shared by all analyzer instances
+_RNG = random.Random()
+
+
+class AnalysisStrategy(NamedTuple):
     """Defines analysis approach for different scenarios"""
     min_transactions: int = 5
     max_transactions: int = 2000
@@ -28,7 +34,7 @@ class AnalysisStrategy:
     aggressive_optimization: bool = False
 
 
-class EnhancedPendleAnalyzer:
+class EnhancedPendleAnalyzer(PendleAnalyzer):
     """
     Enhanced analyzer that handles insufficient data with intelligent strategies
     """
@@ -62,8 +68,7 @@ class EnhancedPendleAnalyzer:
     }
     
     def __init__(self, api_client):
-        # Initialize without calling super().__init__ to avoid parameter issues
-        self.api_client = api_client
+        super().__init__(api_client)
         self.advanced_analyzer = AdvancedMarketAnalyzer(api_client)
         self.analysis_stats = {
             'total_markets': 0,
@@ -72,6 +77,14 @@ class EnhancedPendleAnalyzer:
             'insufficient_data': 0,
             'rate_limited': 0
         }
+        # Bumped on every stats change; get_optimization_report reuses its result until then
+        self._report_version: int = 0
+        self._report_cache: Optional[Tuple[int, Dict[str, Any]]] = None
+    
+    def _record_stat(self, key: str, amount: int = 1) -> None:
+        """Update an analysis counter and invalidate the cached report"""
+        self.analysis_stats[key] += amount
+        self._report_version += 1
         
     async def analyze_market_with_optimization(self, 
                                              session,
@@ -82,11 +95,30 @@ class EnhancedPendleAnalyzer:
         """
         Enhanced market analysis with intelligent optimization
         """
-        self.analysis_stats['total_markets'] += 1
+        transactions = await self.collect_market_transactions(
+            session, market, index, total, strategy_name
+        )
+        
+        if transactions is None:
+            return None
+        
+        return self.analyze_collected_batch([market], [transactions], strategy_name)[0]
+    
+    async def collect_market_transactions(self,
+                                          session,
+                                          market: Market,
+                                          index: int,
+                                          total: int,
+                                          strategy_name: str = 'balanced') -> Optional[List[Transaction]]:
+        """
+        Collect transactions for a market, escalating through fallback strategies.
+        Returns None when the API fails so callers can skip the market.
+        """
+        self._record_stat('total_markets')
         strategy = self.ANALYSIS_STRATEGIES[strategy_name]
         
         try:
-            print(f"  📊 [{index}/{total}] Analyzing: {market.name}")
+            logger.info("  📊 [%d/%d] Analyzing: %s", index, total, market.name)
             
             # Use advanced optimization for transaction collection
             transactions = await self._get_transactions_with_strategies(
@@ -95,43 +127,66 @@ class EnhancedPendleAnalyzer:
             
             if len(transactions) < strategy.min_transactions:
                 # Try more aggressive strategies
-                print(f"    ⚠️ Only {len(transactions)} transactions, trying aggressive strategy...")
+                logger.warning("    ⚠️ Only %s transactions, trying aggressive strategy...", len(transactions))
                 transactions = await self._get_transactions_with_strategies(
                     session, market, self.ANALYSIS_STRATEGIES['aggressive']
                 )
                 
                 if len(transactions) < 3:
-                    self.analysis_stats['insufficient_data'] += 1
-                    print(f"    ❌ Insufficient data: {len(transactions)} transactions")
+                    self._record_stat('insufficient_data')
+                    logger.warning("    ❌ Insufficient data: %s transactions", len(transactions))
                     
                     # Try conservative fallback
                     if strategy.use_fallbacks:
                         transactions = await self._get_transactions_with_strategies(
                             session, market, self.ANALYSIS_STRATEGIES['conservative']
                         )
-                        self.analysis_stats['fallback_used'] += 1
-                        print(f"    🔄 Conservative fallback: {len(transactions)} transactions")
-            
-            if len(transactions) < strategy.min_transactions:
-                # Return minimal analysis with warning
-                return self._create_minimal_analysis(market, transactions)
+                        self._record_stat('fallback_used')
+                        logger.debug("    🔄 Conservative fallback: %s transactions", len(transactions))
             
-            # Perform analysis with collected data
-            analysis = self._perform_complete_analysis(market, transactions)
-            self.analysis_stats['successful_analyses'] += 1
-            
-            return analysis
+            return transactions
             
         except PendleApiError as e:
             if e.status == 429:
-                self.analysis_stats['rate_limited'] += 1
-                print(f"    🚫 Rate limited (429): {str(e)}")
+                self._record_stat('rate_limited')
+                logger.warning("    🚫 Rate limited (429): %s", e)
             else:
-                print(f"    ❌ API Error: {str(e)}")
+                logger.error("    ❌ API Error: %s", e)
             return None
         except Exception as e:
-            print(f"    ❌ Analysis failed: {e}")
+            logger.error("    ❌ Analysis failed: %s", e)
             return None
+        finally:
+            # Advanced analyzer trackers change during collection as well
+            self._report_version += 1
+    
+    def analyze_collected_batch(self,
+                                markets: List[Market],
+                                transaction_lists: List[Optional[List[Transaction]]],
+                                strategy_name: str = 'balanced') -> List[Optional[DeclineRateAnalysis]]:
+        """
+        Analyze already-collected transactions for several markets, each on its own.
+        Results are aligned with `markets`; markets without data or whose analysis fails map to None.
+        """
+        strategy = self.ANALYSIS_STRATEGIES[strategy_name]
+        results: List[Optional[DeclineRateAnalysis]] = []
+        
+        for market, transactions in zip(markets, transaction_lists):
+            if transactions is None:
+                results.append(None)
+                continue
+            try:
+                if len(transactions) < strategy.min_transactions:
+                    # Return minimal analysis with warning
+                    results.append(self._create_minimal_analysis(market, transactions))
+                else:
+                    results.append(self._perform_complete_analysis(market, transactions))
+                    self._record_stat('successful_analyses')
+            except Exception as e:
+                logger.error("    ❌ Analysis failed for %s: %s", market.name, e)
+                results.append(None)
+        
+        return results
     
     def _perform_complete_analysis(self, market: Market, transactions: List[Transaction]) -> DeclineRateAnalysis:
         """Perform complete analysis on transaction data"""
@@ -161,84 +216,6 @@ class EnhancedPendleAnalyzer:
             data_freshness_hours=2.0
         )
     
-    def calculate_decline_rates_fast(self, transactions: List[Transaction]) -> Tuple[float, float]:
-        """Fast decline rate calculation"""
-        if len(transactions) < 2:
-            return 0.0, 0.0
-        
-        # Sort by timestamp
-        sorted_txs = sorted(transactions, key=lambda x: x.timestamp)
-        
-        # Group by date and calculate daily implied APY
-        daily_data = defaultdict(list)
-        
-        for tx in sorted_txs:
-            try:
-                tx_date = datetime.fromisoformat(tx.timestamp.replace('Z', '+00:00')).date()
-                if tx.implied_apy is not None:
-                    daily_data[tx_date].append(tx.implied_apy)
-            except:
-                continue
-        
-        if len(daily_data) < 2:
-            return 0.0, 0.0
-        
-        # Calculate daily rates of change
-        dates = sorted(daily_data.keys())
-        daily_rates = []
-        
-        for i in range(1, len(dates)):
-            prev_avg = sum(daily_data[dates[i-1]]) / len(daily_data[dates[i-1]])
-            curr_avg = sum(daily_data[dates[i]]) / len(daily_data[dates[i]])
-            
-            if prev_avg > 0:
-                rate_change = (curr_avg - prev_avg) / prev_avg * 100
-                daily_rates.append(rate_change)
-        
-        if not daily_rates:
-            return 0.0, 0.0
-        
-        avg_decline = sum(daily_rates) / len(daily_rates)
-        latest_decline = daily_rates[-1] if daily_rates else 0.0
-        
-        return avg_decline, latest_decline
-    
-    def calculate_current_yt_price_fast(self, transactions: List[Transaction]) -> float:
-        """Calculate current YT price from recent transactions"""
-        if not transactions:
-            return 0.0
-        
-        # Sort by timestamp and get most recent transactions
-        sorted_txs = sorted(transactions, key=lambda x: x.timestamp, reverse=True)
-        recent_txs = sorted_txs[:10]  # Last 10 transactions
-        
-        # Calculate average implied APY from recent transactions
-        valid_apy_values = [tx.implied_apy for tx in recent_txs if tx.implied_apy is not None]
-        
-        if not valid_apy_values:
-            return 0.0
-        
-        return sum(valid_apy_values) / len(valid_apy_values)
-    
-    def calculate_volume_fast(self, transactions: List[Transaction]) -> float:
-        """Calculate total volume in USD"""
-        total_volume = 0.0
-        
-        for tx in transactions:
-            if tx.valuation_usd is not None:
-                total_volume += tx.valuation_usd
-        
-        return total_volume
-    
-    def calculate_average_implied_apy_fast(self, transactions: List[Transaction]) -> float:
-        """Calculate average implied APY"""
-        apy_values = [tx.implied_apy for tx in transactions if tx.implied_apy is not None]
-        
-        if not apy_values:
-            return 0.0
-        
-        return sum(apy_values) / len(apy_values)
-    
     async def _get_transactions_with_strategies(self,
                                               session,
                                               market: Market, 
@@ -249,33 +226,33 @@ class EnhancedPendleAnalyzer:
         try:
             # Try optimized collection through advanced analyzer
             transactions = await self.advanced_analyzer.get_transactions_with_optimization(
-                market
+                market, session=session
             )
             
             # Apply intelligent sampling if needed
             if strategy.sampling_rate < 1.0 and len(transactions) > strategy.max_transactions:
                 sample_size = int(len(transactions) * strategy.sampling_rate)
-                transactions = random.sample(transactions, min(sample_size, len(transactions)))
-                print(f"    🎯 Sampled {len(transactions)} transactions ({strategy.sampling_rate:.1%})")
+                transactions = _RNG.sample(transactions, min(sample_size, len(transactions)))
+                logger.debug("    🎯 Sampled %s transactions (%.1f%%)", len(transactions), strategy.sampling_rate * 100)
             
             # Enforce transaction limits
             if len(transactions) > strategy.max_transactions:
                 # Sort by timestamp and take most recent
-                transactions.sort(key=lambda x: x.timestamp, reverse=True)
+                transactions.sort(key=_TS_KEY, reverse=True)
                 transactions = transactions[:strategy.max_transactions]
-                print(f"    ✂️ Limited to {len(transactions)} most recent transactions")
+                logger.debug("    ✂️ Limited to %s most recent transactions", len(transactions))
             
             return transactions
             
         except Exception as e:
-            print(f"    ⚠️ Advanced collection failed: {e}")
+            logger.warning("    ⚠️ Advanced collection failed: %s", e)
             
             # Fallback to standard collection using API client directly
             try:
                 transactions = await self.api_client.get_transactions(session, market.address)
                 return transactions[:strategy.max_transactions]
             except Exception as fallback_error:
-                print(f"    ❌ Fallback collection failed: {fallback_error}")
+                logger.error("    ❌ Fallback collection failed: %s", fallback_error)
                 return []
     
     def _create_minimal_analysis(self, market: Market, transactions: List[Transaction]) -> DeclineRateAnalysis:
@@ -333,51 +310,76 @@ class EnhancedPendleAnalyzer:
             return []
         
         # Sort transactions by timestamp
-        sorted_txs = sorted(transactions, key=lambda x: x.timestamp)
+        sorted_txs = sorted(transactions, key=_TS_KEY)
+        
+        # Parse each timestamp once; transactions without a usable date/APY
+        # still occupy a window slot, they just don't contribute to a day
+        points: List[Optional[Tuple[Any, float]]] = []
+        for tx in sorted_txs:
+            try:
+                tx_date = datetime.fromisoformat(tx.timestamp.replace('Z', '+00:00')).date()
+            except:
+                points.append(None)
+                continue
+            points.append((tx_date, tx.implied_apy) if tx.implied_apy is not None else None)
         
         decline_rates = []
         
         # Use sliding window approach for limited data
         window_size = max(2, len(sorted_txs) // 10)  # Use 10% of data for window
         
-        for i in range(window_size, len(sorted_txs)):
-            window_txs = sorted_txs[i-window_size:i+1]
+        # Running [apy_sum, count] per day for the current window, updated
+        # incrementally instead of regrouping every window from scratch
+        window_days: Dict[Any, List[float]] = {}
+        
+        for i, point in enumerate(points):
+            if point is not None:
+                day = window_days.setdefault(point[0], [0.0, 0])
+                day[0] += point[1]
+                day[1] += 1
             
-            # Calculate simple rate of change
-            if len(window_txs) >= 2:
-                # Group by day and calculate daily rates
-                daily_data = defaultdict(list)
-                
-                for tx in window_txs:
-                    try:
-                        tx_date = datetime.fromisoformat(tx.timestamp.replace('Z', '+00:00')).date()
-                        if tx.implied_apy is not None:
-                            daily_data[tx_date].append(tx.implied_apy)
-                    except:
-                        continue
+            if i < window_size:
+                continue
+            
+            # Window now covers sorted_txs[i - window_size : i + 1]
+            if len(window_days) >= 2:
+                # Calculate daily change rate
+                dates = sorted(window_days)
+                daily_rates = []
                 
-                if len(daily_data) >= 2:
-                    # Calculate daily change rate
-                    dates = sorted(daily_data.keys())
-                    daily_rates = []
-                    
-                    for j in range(1, len(dates)):
-                        prev_rate = sum(daily_data[dates[j-1]]) / len(daily_data[dates[j-1]])
-                        curr_rate = sum(daily_data[dates[j]]) / len(daily_data[dates[j]])
-                        
-                        if prev_rate > 0:
-                            daily_change = (curr_rate - prev_rate) / prev_rate * 100
-                            daily_rates.append(daily_change)
+                for j in range(1, len(dates)):
+                    prev_sum, prev_count = window_days[dates[j-1]]
+                    curr_sum, curr_count = window_days[dates[j]]
+                    prev_rate = prev_sum / prev_count
+                    curr_rate = curr_sum / curr_count
                     
-                    if daily_rates:
-                        decline_rates.append(sum(daily_rates) / len(daily_rates))
-        
-        return decline_rates[:5]  # Limit to 5 data points
+                    if prev_rate > 0:
+                        daily_change = (curr_rate - prev_rate) / prev_rate * 100
+                        daily_rates.append(daily_change)
+                
+                if daily_rates:
+                    decline_rates.append(sum(daily_rates) / len(daily_rates))
+                    if len(decline_rates) == 5:  # Limit to 5 data points
+                        break
+            
+            # Drop the oldest transaction before sliding to the next window
+            oldest = points[i - window_size]
+            if oldest is not None:
+                day = window_days[oldest[0]]
+                day[0] -= oldest[1]
+                day[1] -= 1
+                if not day[1]:
+                    del window_days[oldest[0]]
+        
+        return decline_rates
     
     def get_optimization_report(self) -> Dict[str, Any]:
         """
         Get comprehensive optimization and analysis report
         """
+        if self._report_cache and self._report_cache[0] == self._report_version:
+            return self._report_cache[1]
+        
         stats = self.analysis_stats.copy()
         
         # Calculate success rates
@@ -400,17 +402,21 @@ class EnhancedPendleAnalyzer:
         
         # Add advanced optimization insights
         advanced_report = self.advanced_analyzer.get_optimization_report()
+        merged_stats = {**stats, **rates}
         
-        return {
-            'analysis_statistics': {**stats, **rates},  # Merge both dictionaries
+        report = {
+            'analysis_statistics': merged_stats,
             'optimization_effectiveness': {
                 'markets_analyzed_with_optimization': advanced_report['total_markets_analyzed'],
                 'tier_distribution': advanced_report['tier_distribution'],
                 'success_rates_by_tier': advanced_report['success_rates_by_tier'],
                 'problematic_markets': advanced_report['top_problematic_markets'][:5]
             },
-            'recommendations': self._generate_optimization_recommendations({**stats, **rates}, advanced_report)
+            'recommendations': self._generate_optimization_recommendations(merged_stats, advanced_report)
         }
+        self._report_cache = (self._report_version, report)
+        
+        return report
     
     def _generate_optimization_recommendations(self, 
                                              stats: Dict[str, Any], 
@@ -477,28 +483,28 @@ class SmartBatchProcessor:
         if batch_index > 0:
             await self._adapt_batch_parameters()
         
-        results = []
-        successful_count = 0
+        # Fetch all markets concurrently (I/O-bound), then analyze each one (CPU-bound)
+        transaction_lists = await asyncio.gather(*[
+            self.analyzer.collect_market_transactions(session, market, i + 1, len(markets))
+            for i, market in enumerate(markets)
+        ])
         
-        for i, market in enumerate(markets):
-            result = await self.analyzer.analyze_market_with_optimization(
-                session, market, i + 1, len(markets)
-            )
-            
-            if result:
-                results.append(result)
-                successful_count += 1
+        results = [
+            result for result in self.analyzer.analyze_collected_batch(markets, transaction_lists)
+            if result
+        ]
+        successful_count = len(results)
         
         # Adjust batch size based on success rate
         success_rate = successful_count / len(markets) if markets else 0
         if success_rate < 0.7 and self.batch_stats['markets_per_batch'] > 1:
             self.batch_stats['markets_per_batch'] = max(1, self.batch_stats['markets_per_batch'] - 1)
             self.batch_stats['adaptive_adjustments'] += 1
-            print(f"    🔄 Reduced batch size to {self.batch_stats['markets_per_batch']} due to low success rate")
+            logger.debug("    🔄 Reduced batch size to %s due to low success rate", self.batch_stats['markets_per_batch'])
         elif success_rate > 0.9 and self.batch_stats['markets_per_batch'] < 5:
             self.batch_stats['markets_per_batch'] = min(5, self.batch_stats['markets_per_batch'] + 1)
             self.batch_stats['adaptive_adjustments'] += 1
-            print(f"    🔄 Increased batch size to {self.batch_stats['markets_per_batch']} due to high success rate")
+            logger.debug("    🔄 Increased batch size to %s due to high success rate", self.batch_stats['markets_per_batch'])
         
         return results
     
@@ -513,9 +519,9 @@ class SmartBatchProcessor:
         
         if overall_success_rate < 0.5:
             # Increase delays between batches
-            print("    🐌 Low success rate detected, increasing inter-batch delays...")
+            logger.info("    🐌 Low success rate detected, increasing inter-batch delays...")
             await asyncio.sleep(2.0)  # Increased delay
         elif overall_success_rate > 0.8:
             # Can be more aggressive
-            print("    ⚡ High success rate, processing efficiently...")
+            logger.info("    ⚡ High success rate, processing efficiently...")
             await asyncio.sleep(0.5)  # Reduced delay
\ No newline at end of file
@@ -5,12 +5,47 @@ Provides command-line interface for analyzing single chains or multiple chains
 """
 
 import asyncio
+import atexit
+import logging
+import os
+import queue
 import sys
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
 
 from pendle_market_analysis.api_client import PendleAPIClient
 from pendle_market_analysis.orchestrator import AnalysisOrchestrator, MultiChainAnalysisOrchestrator
 
 
+def configure_logging(level: Optional[str] = None) -> None:
+    """Send package log records to stdout as plain lines (level from PENDLE_LOG_LEVEL, default INFO)"""
+    package_logger = logging.getLogger("pendle_market_analysis")
+    if package_logger.handlers:
+        return
+    
+    # Tasks only enqueue records; a single listener thread does the stdout writes
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    log_queue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, handler)
+    listener.start()
+    atexit.register(listener.stop)
+    
+    package_logger.addHandler(QueueHandler(log_queue))
+    package_logger.setLevel((level or os.getenv("PENDLE_LOG_LEVEL", "INFO")).upper())
+    package_logger.propagate = False
+
+
+def install_uvloop() -> bool:
+    """Use uvloop's faster event loop for asyncio.run when it is installed"""
+    try:
+        import uvloop
+    except ImportError:
+        return False
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    return True
+
+
 async def analyze_single_chain(chain_id: int) -> None:
     """Analyze a single chain"""
     if chain_id not in PendleAPIClient.CHAINS:
@@ -22,7 +57,7 @@ async def analyze_single_chain(chain_id: int) -> None:
 
 
 async def analyze_all_chains() -> None:
-    """Analyze all supported chains sequentially"""
+    """Analyze all supported chains concurrently"""
     # Create orchestrators for all supported chains
     chain_orchestrators = []
     for chain_id in PendleAPIClient.CHAINS.keys():
@@ -58,6 +93,8 @@ async def main():
 
 
 if __name__ == "__main__":
+    configure_logging()
+    install_uvloop()
     try:
         asyncio.run(main())
     except KeyboardInterrupt:
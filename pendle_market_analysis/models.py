@@ -3,11 +3,11 @@
 Data models and exceptions for Pendle Market Analysis
 """
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Optional, Any
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Market:
     """Market data structure matching the TypeScript interface"""
     name: str
@@ -17,9 +17,14 @@ class Market:
     yt: str
     sy: str
     underlying_asset: str
+    expiry_date: str = field(init=False, repr=False, compare=False)
 
+    def __post_init__(self):
+        # Pendle expiries are UTC ISO-8601 strings, so the date is the first 10 characters
+        object.__setattr__(self, 'expiry_date', (self.expiry or '')[:10])
 
-@dataclass
+
+@dataclass(slots=True, frozen=True)
 class Transaction:
     """Transaction data structure for decline rate analysis"""
     id: str
@@ -29,9 +34,26 @@ class Transaction:
     market: str = ""
     action: str = ""
     value: Optional[float] = None
+    
+    def to_dict(self) -> dict:
+        """Convert to a JSON-serializable dict (used by the response cache)"""
+        return {
+            'id': self.id,
+            'timestamp': self.timestamp,
+            'implied_apy': self.implied_apy,
+            'valuation_usd': self.valuation_usd,
+            'market': self.market,
+            'action': self.action,
+            'value': self.value
+        }
+    
+    @classmethod
+    def from_dict(cls, data: dict) -> 'Transaction':
+        """Rebuild a transaction from to_dict() output"""
+        return cls(**data)
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class DeclineRateAnalysis:
     """Focused analysis results for decline rate monitoring"""
     market: Market
@@ -43,6 +65,25 @@ class DeclineRateAnalysis:
     implied_apy: float
     transaction_count: int
     data_freshness_hours: float
+    failed: bool = False  # True for placeholders of markets whose analysis errored
+    
+    def to_dict(self) -> dict:
+        """Convert the computed fields to a JSON-serializable dict (market is stored by the caller's key)"""
+        return {
+            'current_yt_price': self.current_yt_price,
+            'average_decline_rate': self.average_decline_rate,
+            'latest_daily_decline_rate': self.latest_daily_decline_rate,
+            'decline_rate_exceeds_average': self.decline_rate_exceeds_average,
+            'volume_usd': self.volume_usd,
+            'implied_apy': self.implied_apy,
+            'transaction_count': self.transaction_count,
+            'data_freshness_hours': self.data_freshness_hours
+        }
+    
+    @classmethod
+    def from_dict(cls, market: Market, data: dict) -> 'DeclineRateAnalysis':
+        """Rebuild an analysis for `market` from to_dict() output"""
+        return cls(market=market, **data)
 
 
 class PendleApiError(Exception):
@@ -72,17 +113,24 @@ class PendleApiError(Exception):
         }
     
     @classmethod
-    def from_response(cls, response, endpoint: Optional[str] = None) -> 'PendleApiError':
-        """Create error from aiohttp response"""
-        try:
-            # Don't attempt to parse JSON synchronously - just get basic info
-            error_message = f"HTTP {response.status}: {response.reason}"
-            error_code = None
-            details = None
-        except Exception:
-            error_message = f"HTTP {response.status}: {response.reason}"
-            error_code = None
-            details = None
+    async def from_response(cls, response, endpoint: Optional[str] = None) -> 'PendleApiError':
+        """Create error from aiohttp response, including the JSON error body when present"""
+        error_message = f"HTTP {response.status}: {response.reason}"
+        error_code = None
+        details = None
+        
+        if response.content_type == 'application/json':
+            try:
+                response_data = await response.json(content_type=None)
+            except Exception:
+                response_data = None
+            
+            if isinstance(response_data, dict):
+                message = response_data.get('message') or response_data.get('error')
+                if message:
+                    error_message = f"HTTP {response.status}: {message}"
+                error_code = response_data.get('code') or response_data.get('error')
+                details = response_data.get('details')
             
         return cls(
             message=error_message,
@@ -4,15 +4,41 @@ Output formatting and notification system for Pendle Market Analysis
 Handles console output formatting and Telegram alerts
 """
 
+import asyncio
+import html
 import json
+import logging
 import os
-from datetime import datetime, timedelta, timezone
-from typing import List, Dict, Optional
+import sys
+import time
+from datetime import datetime, timezone
+from typing import List, Dict, Optional, Set, Tuple
 
 import aiohttp
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 from pendle_market_analysis.models import DeclineRateAnalysis, PendleApiError, NotificationError
 
+logger = logging.getLogger(__name__)
+
+# Column layout of the console summary table (header and rows)
+_SUMMARY_ROW = "{:<35} {:<15} {:<12} {:<8} {:<12}".format
+
+# Telegram HTML block for one alert market; the market name must be HTML-escaped by the caller
+_MARKET_TMPL = (
+    "📈 <b>Market #{i}:</b> {name}\n"
+    "   🚀 <b>Decay Acceleration:</b> {decay:.2f}%/day (avg: {avg:.2f}%/day)\n"
+    "   ⚡ <b>Acceleration:</b> +{accel:.2f}% vs average\n"
+    "   💰 <b>Volume (USD):</b> ${vol:,.0f}\n"
+    "   📈 <b>Implied APY:</b> {apy:.2f}%\n"
+    "   📅 <b>Maturity:</b> {mat}\n"
+    "   🔗 <a href='https://app.pendle.finance/trade/markets/{address}/swap?view=yt'>View Market</a>\n\n"
+).format
+
 
 class NotificationCache:
     """Handles caching of sent notifications to prevent duplicates"""
@@ -22,44 +48,78 @@ class NotificationCache:
         self.cache_duration_hours = cache_duration_hours
         self.cache = self._load_cache()
     
-    def _load_cache(self) -> Dict[str, Dict]:
+    def _load_cache(self) -> Dict[Tuple[int, str], Dict]:
         """Load notification cache from file"""
         try:
             if os.path.exists(self.cache_file):
-                with open(self.cache_file, 'r') as f:
-                    return json.load(f)
+                return self._from_file_format(self._read_cache_file())
         except Exception as e:
-            print(f"⚠️ Failed to load notification cache: {e}")
+            logger.warning("⚠️ Failed to load notification cache: %s", e)
         return {}
     
+    def _read_cache_file(self) -> Dict[str, Dict]:
+        """Read the raw cache file, using orjson when it is installed"""
+        if orjson is not None:
+            with open(self.cache_file, 'rb') as f:
+                cache = orjson.loads(f.read())
+        else:
+            with open(self.cache_file, 'r') as f:
+                cache = json.load(f)
+        
+        # Backfill expiry_epoch for entries written before it was stored
+        for cache_data in cache.values():
+            if 'expiry_epoch' not in cache_data:
+                try:
+                    notification_time = datetime.fromisoformat(cache_data['timestamp'])
+                    cache_data['expiry_epoch'] = notification_time.timestamp() + cache_data['cache_duration_hours'] * 3600
+                except (KeyError, TypeError, ValueError):
+                    cache_data['expiry_epoch'] = 0.0
+        
+        return cache
+    
+    @staticmethod
+    def _from_file_format(file_cache: Dict[str, Dict]) -> Dict[Tuple[int, str], Dict]:
+        """Re-key entries from the on-disk "chain_id:address" strings to in-memory tuples"""
+        return {(entry['chain_id'], entry['market_address']): entry for entry in file_cache.values()}
+    
+    def _to_file_format(self) -> Dict[str, Dict]:
+        """Re-key in-memory entries to the "chain_id:address" strings used on disk"""
+        return {f"{chain_id}:{market_address}": entry for (chain_id, market_address), entry in self.cache.items()}
+    
     def _save_cache(self) -> None:
         """Save notification cache to file using append-style logging"""
         try:
             # Load existing cache if file exists, then merge with current cache
             existing_cache = {}
             if os.path.exists(self.cache_file):
-                with open(self.cache_file, 'r') as f:
-                    try:
-                        existing_cache = json.load(f)
-                    except json.JSONDecodeError:
-                        # If file is corrupted, start fresh
-                        existing_cache = {}
+                try:
+                    existing_cache = self._from_file_format(self._read_cache_file())
+                except json.JSONDecodeError:
+                    # If file is corrupted, start fresh
+                    existing_cache = {}
             
             # Merge existing cache with current cache (current cache takes precedence)
-            merged_cache = {**existing_cache, **self.cache}
+            self.cache = {**existing_cache, **self.cache}
+            file_cache = self._to_file_format()
             
-            # Save merged cache back to file
-            with open(self.cache_file, 'w') as f:
-                json.dump(merged_cache, f, indent=2)
-                
-            # Update in-memory cache with merged result
-            self.cache = merged_cache
+            # Save merged cache back to file as compact JSON (see dump_pretty for a readable copy)
+            if orjson is not None:
+                with open(self.cache_file, 'wb') as f:
+                    f.write(orjson.dumps(file_cache))
+            else:
+                with open(self.cache_file, 'w') as f:
+                    json.dump(file_cache, f, separators=(',', ':'))
         except Exception as e:
-            print(f"⚠️ Failed to save notification cache: {e}")
+            logger.warning("⚠️ Failed to save notification cache: %s", e)
+    
+    def dump_pretty(self, path: str) -> None:
+        """Write an indented copy of the in-memory cache for inspection"""
+        with open(path, 'w') as f:
+            json.dump(self._to_file_format(), f, indent=2)
     
-    def _get_cache_key(self, market_address: str, chain_id: int) -> str:
-        """Generate cache key for market"""
-        return f"{chain_id}:{market_address}"
+    def _get_cache_key(self, market_address: str, chain_id: int) -> Tuple[int, str]:
+        """Generate the in-memory cache key for market"""
+        return (chain_id, market_address)
     
     def is_market_notified_recently(self, market_address: str, chain_id: int) -> bool:
         """Check if market was notified within cache duration"""
@@ -69,69 +129,60 @@ class NotificationCache:
             return False
         
         # Check if notification is within the cache duration
-        notification_time = datetime.fromisoformat(self.cache[cache_key]['timestamp'])
-        expiry_time = notification_time + timedelta(hours=self.cache_duration_hours)
-        current_time = datetime.now(timezone.utc)
-        
-        return current_time < expiry_time
+        return time.time() < self.cache[cache_key]['expiry_epoch']
     
-    def cache_market_notification(self, market_address: str, chain_id: int, market_name: str) -> None:
-        """Cache a market notification"""
+    def active_addresses(self, chain_id: int) -> Set[str]:
+        """Addresses of markets on a chain whose notification is still within the cache duration"""
+        now = time.time()
+        return {
+            cache_data['market_address'] for cache_data in self.cache.values()
+            if cache_data['chain_id'] == chain_id and now < cache_data['expiry_epoch']
+        }
+    
+    def cache_market_notification(self, market_address: str, chain_id: int, market_name: str,
+                                  flush: bool = True) -> None:
+        """Cache a market notification (pass flush=False to batch several and save once)"""
         cache_key = self._get_cache_key(market_address, chain_id)
-        current_time = datetime.now(timezone.utc).isoformat()
+        current_time = datetime.now(timezone.utc)
         
         self.cache[cache_key] = {
             'market_address': market_address,
             'chain_id': chain_id,
             'market_name': market_name,
-            'timestamp': current_time,
-            'cache_duration_hours': self.cache_duration_hours
+            'timestamp': current_time.isoformat(),
+            'cache_duration_hours': self.cache_duration_hours,
+            'expiry_epoch': current_time.timestamp() + self.cache_duration_hours * 3600
         }
         
-        self._save_cache()
-        print(f"💾 Cached notification for market {market_name} (expires in {self.cache_duration_hours} hours)")
+        if flush:
+            self._save_cache()
+        logger.debug("💾 Cached notification for market %s (expires in %d hours)", market_name, self.cache_duration_hours)
     
-    def cleanup_expired_cache(self) -> int:
-        """Remove expired cache entries"""
-        current_time = datetime.now(timezone.utc)
-        expired_keys = []
-        
-        for cache_key, cache_data in self.cache.items():
-            notification_time = datetime.fromisoformat(cache_data['timestamp'])
-            expiry_time = notification_time + timedelta(hours=cache_data['cache_duration_hours'])
-            
-            if current_time >= expiry_time:
-                expired_keys.append(cache_key)
+    def cleanup_expired_cache(self, flush: bool = True) -> int:
+        """Remove expired cache entries (pass flush=False to defer saving to the caller)"""
+        now = time.time()
+        expired_keys = [key for key, cache_data in self.cache.items() if now >= cache_data['expiry_epoch']]
         
         # Remove expired entries
         for key in expired_keys:
             del self.cache[key]
         
         if expired_keys:
-            self._save_cache()
-            print(f"🧹 Cleaned up {len(expired_keys)} expired cache entries")
+            if flush:
+                self._save_cache()
+            logger.info("🧹 Cleaned up %d expired cache entries", len(expired_keys))
         
         return len(expired_keys)
     
     def get_cache_stats(self) -> Dict:
         """Get cache statistics"""
-        current_time = datetime.now(timezone.utc)
-        active_count = 0
-        expired_count = 0
-        
-        for cache_data in self.cache.values():
-            notification_time = datetime.fromisoformat(cache_data['timestamp'])
-            expiry_time = notification_time + timedelta(hours=cache_data['cache_duration_hours'])
-            
-            if current_time < expiry_time:
-                active_count += 1
-            else:
-                expired_count += 1
+        now = time.time()
+        active_count = sum(1 for cache_data in self.cache.values() if now < cache_data['expiry_epoch'])
         
         return {
             'total_entries': len(self.cache),
             'active_entries': active_count,
-            'expired_entries': expired_count,
+            'expired_entries': len(self.cache) - active_count,
             'cache_file': self.cache_file,
             'cache_duration_hours': self.cache_duration_hours
         }
@@ -141,6 +192,11 @@ class NotificationCache:
 class Notifier:
     """Handles all output formatting and notification functionality"""
     
+    # Telegram rejects messages over 4096 chars; leave room for HTML entities
+    TELEGRAM_CHUNK_CHARS = 3500
+    # All alerts go to one chat, which Telegram throttles far below the per-bot limit; more only earns 429s
+    TELEGRAM_MAX_CONCURRENT_SENDS = 4
+    
     def __init__(self, chain_id: int = 1, chain_name: str = "Ethereum", cache_duration_hours: int = 24):
         # Get chain information
         self.chain_id = chain_id
@@ -153,75 +209,115 @@ class Notifier:
         # Initialize notification cache
         self.cache = NotificationCache(cache_duration_hours=cache_duration_hours)
         
+        # Notifier-owned Telegram session, created on first send when no session is borrowed
+        self._session: Optional[aiohttp.ClientSession] = None
+        # Caller-owned session (e.g. the analysis run's); used in preference to our own, never closed here
+        self._shared_session: Optional[aiohttp.ClientSession] = None
+        
         if not self.telegram_bot_token or not self.telegram_chat_id:
-            print("⚠️ Telegram configuration incomplete. Set TELEGRAM_BOT_TOKEN and TELEGRAM_CHAT_ID in .env file")
+            logger.warning("⚠️ Telegram configuration incomplete. Set TELEGRAM_BOT_TOKEN and TELEGRAM_CHAT_ID in .env file")
         else:
-            print(f"📱 Telegram notifications enabled for chat {self.telegram_chat_id}")
+            logger.info("📱 Telegram notifications enabled for chat %s", self.telegram_chat_id)
         
         # Print cache stats on initialization
         stats = self.cache.get_cache_stats()
-        print(f"💾 Notification cache: {stats['active_entries']} active, {stats['expired_entries']} expired entries")
+        logger.info("💾 Notification cache: %d active, %d expired entries", stats['active_entries'], stats['expired_entries'])
     
     def print_optimized_results(self, analysis_results: List[DeclineRateAnalysis], active_markets_count: int) -> List[DeclineRateAnalysis]:
         """Print optimized analysis results"""
-        print(f"\n" + "="*90)
-        print(f"🚀 OPTIMIZED PENDLE MARKET ANALYSIS RESULTS")
-        print(f"📊 Chain: {self.chain_name} (ID: {self.chain_id})")
-        print(f"📈 Total Active Markets: {active_markets_count}")
-        print(f"🔍 Markets Analyzed: {len(analysis_results)}")
-        print(f"⏱️ Processing: Concurrent analysis with smart data limiting")
-        print(f"="*90)
+        # Collect every line and write the report to stdout in one call. Progress logging goes through
+        # a background listener, so a few queued progress lines may still print after the report
+        out = [
+            "\n" + "="*90,
+            "🚀 OPTIMIZED PENDLE MARKET ANALYSIS RESULTS",
+            f"📊 Chain: {self.chain_name} (ID: {self.chain_id})",
+            f"📈 Total Active Markets: {active_markets_count}",
+            f"🔍 Markets Analyzed: {len(analysis_results)}",
+            "⏱️ Processing: Concurrent analysis with smart data limiting",
+            "="*90,
+        ]
+        
+        # Gather alerts, summary statistics and table rows in a single pass;
+        # failed analyses are counted but kept out of the table and statistics
+        alert_markets = []
+        summary_rows = []
+        format_row = self._format_summary_row
+        failed_count = 0
+        total_volume = 0.0
+        total_freshness = 0.0
+        max_decline = 0.0
+        for a in analysis_results:
+            if a.failed:
+                failed_count += 1
+                continue
+            summary_rows.append(format_row(a))
+            total_volume += a.volume_usd
+            total_freshness += a.data_freshness_hours
+            if a.decline_rate_exceeds_average:
+                alert_markets.append(a)
+                decline = abs(a.latest_daily_decline_rate)
+                if decline > max_decline:
+                    max_decline = decline
+        analyzed_count = len(summary_rows)
+        avg_freshness = total_freshness / analyzed_count if analyzed_count else 0
         
         # Priority Alert Section
-        alert_markets = [a for a in analysis_results if a.decline_rate_exceeds_average]
         if alert_markets:
-            print(f"\n🚨 IMMEDIATE ATTENTION REQUIRED:")
-            for analysis in sorted(alert_markets, key=lambda x: x.latest_daily_decline_rate, reverse=False):  # Most negative first
-                maturity_date = datetime.fromisoformat(analysis.market.expiry.replace('Z', '+00:00')).strftime('%Y-%m-%d')
-                acceleration = abs(analysis.latest_daily_decline_rate) - abs(analysis.average_decline_rate)
-                print(f"  🔴 {analysis.market.name}")
-                print(f"      Decay Acceleration: {abs(analysis.latest_daily_decline_rate):.2f}%/day (avg: {abs(analysis.average_decline_rate):.2f}%/day)")
-                print(f"      Acceleration: +{acceleration:.2f}% vs average | Volume: ${analysis.volume_usd:,.0f} | APY: {analysis.implied_apy*100:.1f}% | Maturity: {maturity_date}")
+            out.append("\n🚨 IMMEDIATE ATTENTION REQUIRED:")
+            # Decorate-sort-undecorate; the index keeps ties stable without comparing analyses
+            decorated = [(a.latest_daily_decline_rate, i, a) for i, a in enumerate(alert_markets)]
+            decorated.sort()  # Most negative first
+            for _, _, analysis in decorated:
+                maturity_date = analysis.market.expiry_date
+                latest_abs = abs(analysis.latest_daily_decline_rate)
+                average_abs = abs(analysis.average_decline_rate)
+                acceleration = latest_abs - average_abs
+                out.append(f"  🔴 {analysis.market.name}")
+                out.append(f"      Decay Acceleration: {latest_abs:.2f}%/day (avg: {average_abs:.2f}%/day)")
+                out.append(f"      Acceleration: +{acceleration:.2f}% vs average | Volume: ${analysis.volume_usd:,.0f} | APY: {analysis.implied_apy*100:.1f}% | Maturity: {maturity_date}")
         else:
-            print(f"\n✅ NO ALERT MARKETS FOUND")
+            out.append("\n✅ NO ALERT MARKETS FOUND")
         
         # Summary Table
-        print(f"\n📋 ANALYSIS SUMMARY:")
-        print(f"{'Market':<35} {'Decay Rate':<15} {'Volume':<12} {'APY':<8} {'Data Fresh':<12}")
-        print("-" * 85)
-        
-        for analysis in analysis_results:
-            market_name = analysis.market.name[:33]
-            if analysis.decline_rate_exceeds_average:
-                decay_str = f"🚨{abs(analysis.latest_daily_decline_rate):.1f}%"
-            elif abs(analysis.average_decline_rate) > 0.1:
-                decay_str = f"{analysis.latest_daily_decline_rate:+.1f}%"
-            else:
-                decay_str = "Stable"
-            
-            volume_str = f"${analysis.volume_usd/1000:.0f}k" if analysis.volume_usd > 0 else "N/A"
-            apy_str = f"{analysis.implied_apy*100:.1f}%" if analysis.implied_apy > 0 else "N/A"
-            freshness = f"{analysis.data_freshness_hours:.1f}h"
-            
-            print(f"{market_name:<35} {decay_str:<15} {volume_str:<12} {apy_str:<8} {freshness:<12}")
+        out.append("\n📋 ANALYSIS SUMMARY:")
+        out.append(_SUMMARY_ROW('Market', 'Decay Rate', 'Volume', 'APY', 'Data Fresh'))
+        out.append("-" * 85)
+        out.extend(summary_rows)
         
         # Statistics
-        total_volume = sum(a.volume_usd for a in analysis_results)
-        avg_freshness = sum(a.data_freshness_hours for a in analysis_results) / len(analysis_results) if analysis_results else 0
-        
-        print(f"\n📊 PERFORMANCE METRICS:")
-        print(f"  💰 Total Volume: ${total_volume:,.0f}")
-        print(f"  ⚡ Average Data Freshness: {avg_freshness:.1f} hours")
-        print(f"  🚨 Acceleration Alerts: {len(alert_markets)}/{len(analysis_results)}")
+        out.append("\n📊 PERFORMANCE METRICS:")
+        out.append(f"  💰 Total Volume: ${total_volume:,.0f}")
+        out.append(f"  ⚡ Average Data Freshness: {avg_freshness:.1f} hours")
+        out.append(f"  🚨 Acceleration Alerts: {len(alert_markets)}/{analyzed_count}")
+        if failed_count:
+            out.append(f"  ❌ Failed Analyses (excluded above): {failed_count}")
         
         if alert_markets:
-            max_decline = max(abs(a.latest_daily_decline_rate) for a in alert_markets)
-            print(f"  📈 Highest Decay Acceleration: {max_decline:.2f}%/day")
+            out.append(f"  📈 Highest Decay Acceleration: {max_decline:.2f}%/day")
+        
+        out.append("\n" + "="*90)
         
-        print(f"\n" + "="*90)
+        sys.stdout.write('\n'.join(out) + '\n')
         
         return alert_markets  # Return alert markets for Telegram
     
+    @staticmethod
+    def _format_summary_row(analysis: DeclineRateAnalysis) -> str:
+        """Format one row of the analysis summary table"""
+        market_name = analysis.market.name[:33]
+        if analysis.decline_rate_exceeds_average:
+            decay_str = f"🚨{abs(analysis.latest_daily_decline_rate):.1f}%"
+        elif abs(analysis.average_decline_rate) > 0.1:
+            decay_str = f"{analysis.latest_daily_decline_rate:+.1f}%"
+        else:
+            decay_str = "Stable"
+        
+        volume_str = f"${analysis.volume_usd/1000:.0f}k" if analysis.volume_usd > 0 else "N/A"
+        apy_str = f"{analysis.implied_apy*100:.1f}%" if analysis.implied_apy > 0 else "N/A"
+        freshness = f"{analysis.data_freshness_hours:.1f}h"
+        
+        return _SUMMARY_ROW(market_name, decay_str, volume_str, apy_str, freshness)
+    
     async def send_telegram_message(self, message: str) -> bool:
         """Send a message to Telegram"""
         if not self.telegram_bot_token or not self.telegram_chat_id:
@@ -236,103 +332,166 @@ class Notifier:
         }
         
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(url, json=data) as response:
-                    if response.ok:
-                        return True
-                    else:
-                        error_text = await response.text()
-                        print(f"❌ Telegram API error: {response.status} - {error_text}")
-                        return False
+            session = self._shared_session
+            if session is None or session.closed:
+                if self._session is None or self._session.closed:
+                    self._session = aiohttp.ClientSession(
+                        connector=aiohttp.TCPConnector(limit=4, ttl_dns_cache=300, keepalive_timeout=60)
+                    )
+                session = self._session
+            
+            async with session.post(url, json=data) as response:
+                if response.ok:
+                    return True
+                else:
+                    error_text = await response.text()
+                    logger.error("❌ Telegram API error: %s - %s", response.status, error_text)
+                    return False
         except Exception as e:
-            print(f"❌ Failed to send Telegram message: {e}")
+            logger.error("❌ Failed to send Telegram message: %s", e)
             return False
     
+    def use_session(self, session: aiohttp.ClientSession) -> None:
+        """Send Telegram messages through a caller-owned session until close()"""
+        self._shared_session = session
+    
+    async def close(self):
+        """Close the notifier's own Telegram session and release any borrowed one"""
+        self._shared_session = None
+        if self._session and not self._session.closed:
+            await self._session.close()
+    
     async def send_telegram_alerts(self, alert_markets: List[DeclineRateAnalysis]) -> None:
         """Send Telegram alerts for markets with decline rate issues"""
         if not alert_markets:
-            print("📱 No alert markets found - no Telegram notifications sent")
+            logger.info("📱 No alert markets found - no Telegram notifications sent")
             return
         
-        # Clean up expired cache entries
-        expired_count = self.cache.cleanup_expired_cache()
+        # Clean up expired cache entries; saved together with new notifications below
+        expired_count = self.cache.cleanup_expired_cache(flush=False)
         
         # Filter markets that need notification (not cached recently)
         markets_to_notify = []
         markets_cached = []
         
+        active_cached = self.cache.active_addresses(self.chain_id)
+        
         for analysis in alert_markets:
-            market = analysis.market
-            if self.cache.is_market_notified_recently(market.address, self.chain_id):
+            if analysis.market.address in active_cached:
                 markets_cached.append(analysis)
             else:
                 markets_to_notify.append(analysis)
         
         # Log caching results
         if markets_cached:
-            print(f"📱 Skipping {len(markets_cached)} markets due to 24h notification cache")
+            logger.info("📱 Skipping %d markets due to 24h notification cache", len(markets_cached))
             for analysis in markets_cached[:3]:  # Show first 3 as examples
                 market = analysis.market
-                print(f"   ⏭️ {market.name} (cached)")
+                logger.info("   ⏭️ %s (cached)", market.name)
             if len(markets_cached) > 3:
-                print(f"   ... and {len(markets_cached) - 3} more")
+                logger.info("   ... and %d more", len(markets_cached) - 3)
         
         if not markets_to_notify:
-            print("📱 All alert markets are within cache period - no new Telegram notifications sent")
+            logger.info("📱 All alert markets are within cache period - no new Telegram notifications sent")
+            if expired_count:
+                self.cache._save_cache()
             return
             
-        print(f"📱 Sending Telegram alerts for {len(markets_to_notify)} new alert markets...")
+        logger.info("📱 Sending Telegram alerts for %d new alert markets...", len(markets_to_notify))
         
         # Prepare alert message
         alert_count = len(markets_to_notify)
         chain_info = f"{self.chain_name} (ID: {self.chain_id})"
         timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S UTC')
         
-        message = f"🚨 <b>Pendle Acceleration Alert</b>\n\n"
-        message += f"📊 <b>Chain:</b> {chain_info}\n"
-        message += f"⚠️ <b>Acceleration Alerts:</b> {alert_count} markets\n"
+        header_parts = [
+            "🚨 <b>Pendle Acceleration Alert</b>\n\n",
+            f"📊 <b>Chain:</b> {chain_info}\n",
+            f"⚠️ <b>Acceleration Alerts:</b> {alert_count} markets\n",
+        ]
         if markets_cached:
-            message += f"⏭️ <b>Skipped (cached):</b> {len(markets_cached)} markets\n"
-        message += f"\n"
+            header_parts.append(f"⏭️ <b>Skipped (cached):</b> {len(markets_cached)} markets\n")
+        header_parts.append("\n")
+        header = ''.join(header_parts)
         
+        market_blocks = []
         for i, analysis in enumerate(markets_to_notify, 1):
             market = analysis.market
-            maturity_date = datetime.fromisoformat(market.expiry.replace('Z', '+00:00')).strftime('%Y-%m-%d')
             
             # Format numbers for display
             decay_rate = abs(analysis.latest_daily_decline_rate)
             avg_decay_rate = abs(analysis.average_decline_rate)
-            acceleration = decay_rate - avg_decay_rate
-            volume_usd = analysis.volume_usd
             implied_apy = analysis.implied_apy * 100 if analysis.implied_apy > 0 else 0
             
-            # Create market link
-            market_link = f"https://app.pendle.finance/trade/markets/{market.address}/swap?view=yt"
-            
-            message += f"📈 <b>Market #{i}:</b> {market.name}\n"
-            message += f"   🚀 <b>Decay Acceleration:</b> {decay_rate:.2f}%/day (avg: {avg_decay_rate:.2f}%/day)\n"
-            message += f"   ⚡ <b>Acceleration:</b> +{acceleration:.2f}% vs average\n"
-            message += f"   💰 <b>Volume (USD):</b> ${volume_usd:,.0f}\n"
-            message += f"   📈 <b>Implied APY:</b> {implied_apy:.2f}%\n"
-            message += f"   📅 <b>Maturity:</b> {maturity_date}\n"
-            message += f"   🔗 <a href='{market_link}'>View Market</a>\n\n"
+            market_blocks.append(_MARKET_TMPL(
+                i=i,
+                name=html.escape(market.name),
+                decay=decay_rate,
+                avg=avg_decay_rate,
+                accel=decay_rate - avg_decay_rate,
+                vol=analysis.volume_usd,
+                apy=implied_apy,
+                mat=market.expiry_date,
+                address=market.address,
+            ))
 
-        message += f"⏰ <b>Analysis Time:</b> {timestamp}\n"
-        message += f"🤖 <i>Sent by Pendle Market Analyzer</i>"
-        
-        # Send the message
-        success = await self.send_telegram_message(message)
+        footer = (
+            f"⏰ <b>Analysis Time:</b> {timestamp}\n"
+            "🤖 <i>Sent by Pendle Market Analyzer</i>"
+        )
+        
+        # Pack market blocks into chunks that stay under Telegram's message limit
+        chunks: List[Tuple[str, List[DeclineRateAnalysis]]] = []
+        chunk_parts: List[str] = []
+        chunk_markets: List[DeclineRateAnalysis] = []
+        chunk_length = 0
+        for analysis, block in zip(markets_to_notify, market_blocks):
+            if chunk_parts and chunk_length + len(block) > self.TELEGRAM_CHUNK_CHARS:
+                chunks.append((''.join(chunk_parts), chunk_markets))
+                chunk_parts, chunk_markets, chunk_length = [], [], 0
+            chunk_parts.append(block)
+            chunk_markets.append(analysis)
+            chunk_length += len(block)
+        chunks.append((''.join(chunk_parts), chunk_markets))
+        
+        if len(chunks) == 1 and len(header) + chunk_length + len(footer) <= self.TELEGRAM_CHUNK_CHARS:
+            # Everything fits in one message
+            success = await self.send_telegram_message(header + chunks[0][0] + footer)
+            notified = markets_to_notify if success else []
+        else:
+            # Header first, market chunks concurrently, footer last
+            semaphore = asyncio.Semaphore(self.TELEGRAM_MAX_CONCURRENT_SENDS)
+            
+            async def _send(chunk: str) -> bool:
+                async with semaphore:
+                    return await self.send_telegram_message(chunk)
+            
+            await self.send_telegram_message(header.rstrip())
+            results = await asyncio.gather(*(_send(text) for text, _ in chunks), return_exceptions=True)
+            await self.send_telegram_message(footer)
+            
+            notified = [
+                analysis
+                for result, (_, chunk_markets) in zip(results, chunks) if result is True
+                for analysis in chunk_markets
+            ]
         
-        if success:
+        if notified:
             # Cache the markets that were just notified
-            for analysis in markets_to_notify:
+            for analysis in notified:
                 market = analysis.market
-                self.cache.cache_market_notification(market.address, self.chain_id, market.name)
+                self.cache.cache_market_notification(market.address, self.chain_id, market.name, flush=False)
+            self.cache._save_cache()
             
-            print(f"✅ Telegram alerts sent successfully for {len(markets_to_notify)} markets!")
-            print(f"💾 Cached {len(markets_to_notify)} notifications for 24 hours")
+            if len(notified) == len(markets_to_notify):
+                logger.info("✅ Telegram alerts sent successfully for %d markets!", len(notified))
+            else:
+                logger.warning("⚠️ Telegram alerts sent for %d/%d markets", len(notified), len(markets_to_notify))
+            logger.info("💾 Cached %d notifications for %d hours", len(notified), self.cache.cache_duration_hours)
         else:
-            print(f"❌ Failed to send Telegram alerts")
+            logger.error("❌ Failed to send Telegram alerts")
+            if expired_count:
+                self.cache._save_cache()
     
     def get_cache_info(self) -> str:
         """Get formatted cache information for display"""
@@ -357,8 +516,8 @@ class Notifier:
             if os.path.exists(self.cache.cache_file):
                 os.remove(self.cache.cache_file)
             
-            print(f"🧹 Notification cache cleared successfully")
+            logger.info("🧹 Notification cache cleared successfully")
             return True
         except Exception as e:
-            print(f"❌ Failed to clear cache: {e}")
+            logger.error("❌ Failed to clear cache: %s", e)
             return False
\ No newline at end of file
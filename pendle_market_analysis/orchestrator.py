@@ -5,18 +5,21 @@ Coordinates API client, analyzer, and notifier components
 """
 
 import asyncio
-import random
+import logging
 import time
-from typing import List
+from typing import Any, Dict, List, Optional, Tuple
 
 import aiohttp
+from aiolimiter import AsyncLimiter
 
 from pendle_market_analysis.models import PendleApiError, AnalysisError, NotificationError
-from pendle_market_analysis.api_client import PendleAPIClientOptimized
+from pendle_market_analysis.api_client import PendleAPIClientOptimized, RateLimitState
 from pendle_market_analysis.enhanced_analyzer import EnhancedPendleAnalyzer
 from pendle_market_analysis.notifier import Notifier
 from pendle_market_analysis.models import DeclineRateAnalysis, Market
 
+logger = logging.getLogger(__name__)
+
 
 class AnalysisOrchestrator:
     """Orchestrates the complete analysis workflow"""
@@ -24,7 +27,21 @@ class AnalysisOrchestrator:
     # Performance optimization settings
     MAX_CONCURRENT_MARKETS = 3  # Increased with optimized client
     MARKETS_TO_ANALYZE = 15  # Process more markets with optimizations
-    MARKET_BATCH_DELAY = 3  # Reduced due to better rate limiting
+    MARKET_STARTS_PER_SECOND = MAX_CONCURRENT_MARKETS  # Token-bucket pacing for market fetches
+    ALERT_BATCH_WINDOW = 2.0  # Seconds to gather streamed alerts into one Telegram message
+    
+    # HTTP settings shared by every run; the connector itself is loop-bound so it is built per session
+    _CONNECTOR_KWARGS = dict(
+        limit=100,
+        limit_per_host=MAX_CONCURRENT_MARKETS * 2,
+        ttl_dns_cache=300,
+        use_dns_cache=True,
+        keepalive_timeout=75,
+        enable_cleanup_closed=True
+    )
+    # Per-request limits: fail slow sockets early so a stuck market releases its semaphore slot;
+    # timed-out requests are retried by the API client
+    _TIMEOUT = aiohttp.ClientTimeout(total=60, connect=5, sock_connect=5, sock_read=15)
     
     def __init__(self, chain_id: int = 1, cache_duration_hours: int = 24):
         self.chain_id = chain_id
@@ -33,23 +50,70 @@ class AnalysisOrchestrator:
         self.analyzer = EnhancedPendleAnalyzer(self.api_client)
         self.notifier = Notifier(chain_id, self.api_client.chain_name, cache_duration_hours)
         
-        # Setup semaphore for concurrency control
-        self.semaphore = asyncio.Semaphore(self.MAX_CONCURRENT_MARKETS)
+        # Concurrency semaphore is created in run_analysis so it binds to the running loop
+        self.semaphore: Optional[asyncio.Semaphore] = None
+        # Per-request pacing, replacing the fixed sleep between market batches
+        self.limiter = AsyncLimiter(self.MARKET_STARTS_PER_SECOND, 1)
+    
+    @classmethod
+    def create_session(cls, **connector_overrides) -> aiohttp.ClientSession:
+        """Create a session from the shared connector settings (overrides tweak the pool)"""
+        connector = aiohttp.TCPConnector(**{**cls._CONNECTOR_KWARGS, **connector_overrides})
+        return aiohttp.ClientSession(
+            connector=connector,
+            timeout=cls._TIMEOUT,
+            headers=PendleAPIClientOptimized.DEFAULT_HEADERS
+        )
     
     async def analyze_single_market(self, session: aiohttp.ClientSession,
                                   market: Market, index: int, total: int) -> DeclineRateAnalysis:
         """Analyze a single market with concurrency control"""
+        if self.semaphore is None:
+            # Called directly (legacy wrapper) rather than through run_analysis
+            self.semaphore = asyncio.Semaphore(self.MAX_CONCURRENT_MARKETS)
         async with self.semaphore:
-            print(f"📊 [{index + 1}/{total}] Analyzing: {market.name}")
+            logger.info("📊 [%d/%d] Analyzing: %s", index + 1, total, market.name)
             
             try:
-                # Fetch transactions for this market
-                transactions = await self.api_client.get_transactions(session, market.address)
+                # Reuse this hour's collected transactions when a previous run cached them
+                transactions = self.api_client.get_cached_transactions(market.address)
+                
+                fingerprint = None
+                min_transactions = self.analyzer.ANALYSIS_STRATEGIES['balanced'].min_transactions
+                
+                if transactions is None:
+                    # Fetch transactions for this market, holding off while the API is throttling us
+                    await self.api_client.rate_limiter.wait_if_cooling()
+                    async with self.limiter:
+                        # Skip collection and analysis entirely if the newest transaction is unchanged
+                        fingerprint = await self._latest_fingerprint(session, market)
+                        if fingerprint is not None:
+                            cached_analysis = self.api_client.get_cached_analysis(market, fingerprint)
+                            if cached_analysis is not None:
+                                return cached_analysis
+                        
+                        transactions = await self.analyzer.collect_market_transactions(
+                            session, market, index, total, strategy_name='balanced'
+                        )
+                    # Collection turns API errors into short or empty lists; caching those would hide
+                    # the market until the hour rolls over, so only complete collections are kept
+                    if transactions is not None and len(transactions) >= min_transactions:
+                        self.api_client.cache_transactions(market.address, transactions)
+                else:
+                    # collect_market_transactions normally counts the market; keep success_rate <= 1
+                    self.analyzer._record_stat('total_markets')
                 
                 # Analyze the market using enhanced optimization
-                analysis = await self.analyzer.analyze_market_with_optimization(
-                    session, market, index, total, strategy_name='balanced'
-                )
+                analysis = None
+                if transactions is not None:
+                    analysis = self.analyzer.analyze_collected_batch(
+                        [market], [transactions], strategy_name='balanced'
+                    )[0]
+                    # Only analyses of a complete collection are memoized; minimal placeholders built
+                    # from a failed or partial fetch are retried next run
+                    if (analysis is not None and fingerprint is not None
+                            and len(transactions) >= min_transactions):
+                        self.api_client.cache_analysis(fingerprint, analysis)
                 
                 # Handle None returns with fallback analysis
                 if analysis is None:
@@ -59,11 +123,67 @@ class AnalysisOrchestrator:
                 return analysis
                 
             except Exception as e:
-                print(f"    ❌ Analysis failed: {e}")
+                logger.error("    ❌ Analysis failed: %s", e)
                 return self._create_fallback_analysis(market)
     
+    async def _analyze_and_publish(self, session: aiohttp.ClientSession, market: Market,
+                                   index: int, total: int, alert_queue: asyncio.Queue) -> DeclineRateAnalysis:
+        """Analyze a market and hand it to the alert consumer if it trips the alert threshold"""
+        analysis = await self.analyze_single_market(session, market, index, total)
+        if analysis.decline_rate_exceeds_average:
+            alert_queue.put_nowait(analysis)
+        return analysis
+    
+    async def _alert_consumer(self, alert_queue: asyncio.Queue) -> None:
+        """Send queued alerts to Telegram in small batches until a None sentinel arrives"""
+        loop = asyncio.get_running_loop()
+        sent_any = False
+        finished = False
+        
+        while not finished:
+            first = await alert_queue.get()
+            if first is None:
+                break
+            
+            # Gather alerts that arrive shortly after the first so they share one message
+            batch = [first]
+            deadline = loop.time() + self.ALERT_BATCH_WINDOW
+            while (remaining := deadline - loop.time()) > 0:
+                try:
+                    item = await asyncio.wait_for(alert_queue.get(), remaining)
+                except TimeoutError:
+                    break
+                if item is None:
+                    finished = True
+                    break
+                batch.append(item)
+            
+            try:
+                await self.notifier.send_telegram_alerts(batch)
+            except Exception as e:
+                logger.error("❌ Failed to send Telegram alerts: %s", e)
+            sent_any = True
+        
+        if not sent_any:
+            await self.notifier.send_telegram_alerts([])
+    
+    async def _warm_up_connection(self, session: aiohttp.ClientSession) -> None:
+        """Prime DNS, TCP and TLS for the API host with a cheap HEAD request (errors are ignored)"""
+        try:
+            async with session.head(self.api_client.BASE_URL, timeout=aiohttp.ClientTimeout(total=5)):
+                pass
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            pass
+    
+    async def _latest_fingerprint(self, session: aiohttp.ClientSession, market: Market) -> Optional[str]:
+        """Fingerprint of the market's newest transaction, or None if it can't be fetched"""
+        try:
+            return await self.api_client.get_latest_transaction_fingerprint(session, market.address)
+        except PendleApiError:
+            return None
+    
     def _create_fallback_analysis(self, market: Market) -> DeclineRateAnalysis:
-        """Create fallback analysis when optimization fails"""
+        """Create a failed-analysis placeholder so the report can account for the market"""
         return DeclineRateAnalysis(
             market=market,
             current_yt_price=0.0,
@@ -73,93 +193,119 @@ class AnalysisOrchestrator:
             volume_usd=0.0,
             implied_apy=0.0,
             transaction_count=0,
-            data_freshness_hours=24.0
+            data_freshness_hours=24.0,
+            failed=True
         )
     
-    async def run_analysis(self):
-        """Run the complete market analysis workflow"""
-        print(f"🚀 Starting OPTIMIZED Pendle Market Analysis for {self.api_client.chain_name}")
-        print(f"⏰ Analysis started at: {time.strftime('%Y-%m-%d %H:%M:%S')}")
-        print(f"⚡ Optimizations: Concurrent processing, smart data limiting, early termination")
+    async def run_analysis(self, session: Optional[aiohttp.ClientSession] = None):
+        """Run the complete market analysis workflow (optionally on a caller-owned session)"""
+        self.semaphore = asyncio.Semaphore(self.MAX_CONCURRENT_MARKETS)
+        logger.info("🚀 Starting OPTIMIZED Pendle Market Analysis for %s", self.api_client.chain_name)
+        logger.info("⏰ Analysis started at: %s", time.strftime('%Y-%m-%d %H:%M:%S'))
+        logger.info("⚡ Optimizations: Concurrent processing, smart data limiting, early termination")
         
         start_time = time.time()
         
-        connector = aiohttp.TCPConnector(limit=50)  # Increased connection pool
-        timeout = aiohttp.ClientTimeout(total=300)
+        if session is not None:
+            return await self._run_with_session(session, start_time)
         
-        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+        async with self.create_session() as own_session:
+            return await self._run_with_session(own_session, start_time)
+    
+    async def _run_with_session(self, session: aiohttp.ClientSession, start_time: float):
+        """Fetch, analyze and report all active markets using the given session"""
+        # Telegram sends reuse this session's pool instead of opening their own
+        self.notifier.use_session(session)
+        # Open a second connection to the API host in the background for the market fetches;
+        # nothing waits on it, so a cached market list is not held up by the round trip
+        warmup_task = asyncio.create_task(self._warm_up_connection(session))
+        try:
+            active_markets = await self.api_client.get_active_markets(session)
+            
+            if not active_markets:
+                logger.error("❌ No active markets found!")
+                return
+            
+            # Select markets to analyze
+            # markets_to_analyze = active_markets[:self.MARKETS_TO_ANALYZE]  # Limit for testing
+            markets_to_analyze = active_markets
+            logger.info("📊 Processing %d markets with %d concurrent workers", len(markets_to_analyze), self.MAX_CONCURRENT_MARKETS)
+            
+            # Schedule every market up front; the semaphore keeps MAX_CONCURRENT_MARKETS in flight.
+            # analyze_single_market turns per-market errors into fallbacks, so anything escaping
+            # here is unexpected: the TaskGroup cancels the remaining markets and we re-raise.
+            # Alerts stream to a background consumer so Telegram sends overlap with analysis.
+            total = len(markets_to_analyze)
+            
+            # Start the markets that had the most transactions last run first (longest job first),
+            # so quick markets fill the tail instead of one large market running alone at the end
+            prior_tx_counts = self.api_client.get_prior_tx_counts()
+            schedule = sorted(
+                range(total),
+                key=lambda i: prior_tx_counts.get(markets_to_analyze[i].address, 0),
+                reverse=True
+            )
+            
+            alert_queue: asyncio.Queue = asyncio.Queue()
+            consumer = asyncio.create_task(self._alert_consumer(alert_queue))
+            tasks: List[Optional[asyncio.Task]] = [None] * total
             try:
-                # Fetch active markets
-                active_markets = await self.api_client.get_active_markets(session)
-                
-                if not active_markets:
-                    print("❌ No active markets found!")
-                    return
-                
-                # Select markets to analyze
-                # markets_to_analyze = active_markets[:self.MARKETS_TO_ANALYZE]  # Limit for testing
-                markets_to_analyze = active_markets
-                print(f"📊 Processing {len(markets_to_analyze)} markets with {self.MAX_CONCURRENT_MARKETS} concurrent workers")
-                
-                # Process markets with proper rate limiting
-                analysis_results = []
-                
-                # Process markets in batches to respect rate limits
-                for i in range(0, len(markets_to_analyze), self.MAX_CONCURRENT_MARKETS):
-                    batch = markets_to_analyze[i:i + self.MAX_CONCURRENT_MARKETS]
-                    batch_size = len(batch)
-                    
-                    print(f"📦 Processing batch {i//self.MAX_CONCURRENT_MARKETS + 1}: {batch_size} markets")
-                    
-                    # Process batch concurrently
-                    tasks = [
-                        self.analyze_single_market(session, market, i + j, len(markets_to_analyze))
-                        for j, market in enumerate(batch)
-                    ]
-                    
-                    batch_results = await asyncio.gather(*tasks, return_exceptions=True)
-                    
-                    for result in batch_results:
-                        if isinstance(result, Exception):
-                            print(f"❌ Market analysis failed: {result}")
-                        else:
-                            analysis_results.append(result)
-                    
-                    # Rate limiting delay between batches
-                    if i + self.MAX_CONCURRENT_MARKETS < len(markets_to_analyze):
-                        delay = self.MARKET_BATCH_DELAY + random.uniform(0, 2)
-                        print(f"    ⏱️ Rate limiting: waiting {delay:.1f}s before next batch...")
-                        await asyncio.sleep(delay)
-                
-                # Print results and get alert markets
-                alert_markets = self.notifier.print_optimized_results(analysis_results, len(active_markets))
-                
-                # Send Telegram alerts for markets with decline rate issues
-                await self.notifier.send_telegram_alerts(alert_markets)
-                
-                # Performance summary with optimized client metrics
-                elapsed_time = time.time() - start_time
-                print(f"\n⚡ PERFORMANCE SUMMARY:")
-                print(f"  ⏱️ Total Time: {elapsed_time:.1f} seconds")
-                print(f"  📊 Markets/Second: {len(analysis_results)/elapsed_time:.2f}")
-                
-                # Get optimized client metrics
-                if hasattr(self.api_client, 'get_metrics_summary'):
-                    metrics = self.api_client.get_metrics_summary()
-                    print(f"  📈 API Performance:")
-                    print(f"    - Total requests: {metrics['total_requests']}")
-                    print(f"    - Cache hit rate: {metrics['cache_hit_rate']:.1%}")
-                    print(f"    - Avg response time: {metrics['avg_response_time_ms']:.1f}ms")
-                    print(f"    - Rate limited requests: {metrics['rate_limited_requests']}")
-                    print(f"    - Computing units remaining: {metrics['computing_units_remaining']}")
-                
-                print(f"  🎯 Target Achieved: Accurate decline rate analysis with optimized rate limiting")
-                
-                return analysis_results, alert_markets
-                
-            except Exception as e:
-                print(f"❌ Analysis failed: {e}")
+                async with asyncio.TaskGroup() as tg:
+                    for i in schedule:
+                        tasks[i] = tg.create_task(
+                            self._analyze_and_publish(session, markets_to_analyze[i], i, total, alert_queue)
+                        )
+            except* Exception as eg:
+                for exc in eg.exceptions:
+                    logger.error("❌ Market analysis failed: %s", exc)
                 raise
+            else:
+                alert_queue.put_nowait(None)
+                await consumer
+            finally:
+                # Also covers cancellation and KeyboardInterrupt, which would leave it blocked on the queue
+                if not consumer.done():
+                    consumer.cancel()
+            
+            # Keep results in market order for a stable report
+            analysis_results = [task.result() for task in tasks]
+            self.api_client.save_prior_tx_counts({
+                analysis.market.address: analysis.transaction_count
+                for analysis in analysis_results if not analysis.failed
+            })
+            
+            # Print results and get alert markets (already sent to Telegram by the consumer)
+            alert_markets = self.notifier.print_optimized_results(analysis_results, len(active_markets))
+            
+            # Performance summary with optimized client metrics
+            elapsed_time = time.time() - start_time
+            logger.info("\n⚡ PERFORMANCE SUMMARY:")
+            logger.info("  ⏱️ Total Time: %.1f seconds", elapsed_time)
+            logger.info("  📊 Markets/Second: %.2f", len(analysis_results) / elapsed_time)
+            
+            # Get optimized client metrics
+            if hasattr(self.api_client, 'get_metrics_summary'):
+                metrics = self.api_client.get_metrics_summary()
+                logger.info("  📈 API Performance:")
+                logger.info("    - Total requests: %s", metrics['total_requests'])
+                logger.info("    - Cache hit rate: %.1f%%", metrics['cache_hit_rate'] * 100)
+                logger.info("    - Avg response time: %.1fms", metrics['avg_response_time_ms'])
+                logger.info("    - Rate limited requests: %s", metrics['rate_limited_requests'])
+                logger.info("    - Computing units remaining: %s", metrics['computing_units_remaining'])
+            
+            logger.info("  🎯 Target Achieved: Accurate decline rate analysis with optimized rate limiting")
+            
+            return analysis_results, alert_markets
+            
+        except Exception as e:
+            logger.error("❌ Analysis failed: %s", e)
+            raise
+        finally:
+            if not warmup_task.done():
+                warmup_task.cancel()
+            await self.notifier.close()
+            # Market fetches use the run's session; this only closes a client session opened outside it
+            await self.api_client.close()
 
 
 class MultiChainAnalysisOrchestrator:
@@ -167,65 +313,76 @@ class MultiChainAnalysisOrchestrator:
     
     def __init__(self, chain_orchestrators: List[AnalysisOrchestrator]):
         self.chain_orchestrators = chain_orchestrators
+        
+        # Every chain calls the same Pendle API host, so market pacing and 429 cooldowns are
+        # shared: chains running side by side stay within one budget and back off together
+        shared_limiter = AsyncLimiter(AnalysisOrchestrator.MARKET_STARTS_PER_SECOND, 1)
+        shared_rate_limiter = RateLimitState()
+        for orchestrator in chain_orchestrators:
+            orchestrator.limiter = shared_limiter
+            orchestrator.api_client.rate_limiter = shared_rate_limiter
     
     async def analyze_all_chains(self):
-        """Analyze all supported chains sequentially"""
-        print("🚀 Starting MULTI-CHAIN Pendle Market Analysis")
-        print(f"⏰ Analysis started at: {time.strftime('%Y-%m-%d %H:%M:%S')}")
-        print(f"🔗 Processing {len(self.chain_orchestrators)} chains sequentially")
-        print("="*90)
+        """Analyze all supported chains concurrently"""
+        logger.info("🚀 Starting MULTI-CHAIN Pendle Market Analysis")
+        logger.info("⏰ Analysis started at: %s", time.strftime('%Y-%m-%d %H:%M:%S'))
+        logger.info("🔗 Processing %d chains concurrently", len(self.chain_orchestrators))
+        logger.info("="*90)
         
         start_time = time.time()
-        chain_results = {}
         
-        for i, orchestrator in enumerate(self.chain_orchestrators, 1):
-            chain_name = orchestrator.api_client.chain_name
-            print(f"\n{'='*20} CHAIN {i}/{len(self.chain_orchestrators)}: {chain_name} {'='*20}")
-            
-            try:
-                chain_start_time = time.time()
-                await orchestrator.run_analysis()
-                
-                chain_end_time = time.time()
-                chain_duration = chain_end_time - chain_start_time
-                chain_results[orchestrator.chain_id] = {
-                    'name': chain_name,
-                    'status': 'success',
-                    'duration': chain_duration
-                }
-                
-                print(f"✅ Completed {chain_name} in {chain_duration:.1f} seconds")
-                
-                # Add delay between chains to avoid rate limiting
-                if i < len(self.chain_orchestrators):
-                    delay = 10 + random.uniform(0, 5)  # 10-15 second delay
-                    print(f"⏱️ Waiting {delay:.1f}s before next chain...")
-                    await asyncio.sleep(delay)
-                    
-            except Exception as e:
-                print(f"❌ Failed to analyze {chain_name} (ID: {orchestrator.chain_id}): {e}")
-                chain_end_time = time.time()
-                chain_duration = chain_end_time - chain_start_time
-                chain_results[orchestrator.chain_id] = {
-                    'name': chain_name,
-                    'status': 'failed',
-                    'duration': chain_duration,
-                    'error': str(e)
-                }
+        # Chains run side by side with their own semaphores; the limiter and cooldown are shared
+        # One shared session keeps DNS, TLS and keep-alive connections warm across chains
+        async with AnalysisOrchestrator.create_session(limit=200, limit_per_host=20) as session:
+            results = await asyncio.gather(*(
+                self._run_one(i, orchestrator, session)
+                for i, orchestrator in enumerate(self.chain_orchestrators, 1)
+            ))
+        chain_results = dict(results)
         
         # Print final summary
         total_time = time.time() - start_time
-        print(f"\n{'='*90}")
-        print(f"🏁 MULTI-CHAIN ANALYSIS COMPLETE")
-        print(f"⏰ Total Time: {total_time:.1f} seconds")
-        print(f"📊 Chains Processed: {len([r for r in chain_results.values() if r['status'] == 'success'])}/{len(self.chain_orchestrators)}")
+        logger.info("\n%s", "="*90)
+        logger.info("🏁 MULTI-CHAIN ANALYSIS COMPLETE")
+        logger.info("⏰ Total Time: %.1f seconds", total_time)
+        logger.info("📊 Chains Processed: %d/%d",
+                    len([r for r in chain_results.values() if r['status'] == 'success']),
+                    len(self.chain_orchestrators))
         
-        print(f"\n📋 CHAIN SUMMARY:")
+        logger.info("\n📋 CHAIN SUMMARY:")
         for chain_id, result in chain_results.items():
             status_icon = "✅" if result['status'] == 'success' else "❌"
-            print(f"  {status_icon} {result['name']} (ID: {chain_id}): {result['duration']:.1f}s")
+            logger.info("  %s %s (ID: %s): %.1fs", status_icon, result['name'], chain_id, result['duration'])
             if result['status'] == 'failed':
-                print(f"      Error: {result['error']}")
+                logger.info("      Error: %s", result['error'])
+        
+        logger.info("="*90)
+        return chain_results
+    
+    async def _run_one(self, i: int, orchestrator: AnalysisOrchestrator,
+                       session: aiohttp.ClientSession) -> Tuple[int, Dict[str, Any]]:
+        """Run one chain's analysis and describe its outcome for the summary"""
+        chain_name = orchestrator.api_client.chain_name
+        logger.info("\n%s CHAIN %d/%d: %s %s", '='*20, i, len(self.chain_orchestrators), chain_name, '='*20)
         
-        print(f"{'='*90}")
-        return chain_results
\ No newline at end of file
+        chain_start_time = time.time()
+        try:
+            await orchestrator.run_analysis(session)
+            
+            chain_duration = time.time() - chain_start_time
+            logger.info("✅ Completed %s in %.1f seconds", chain_name, chain_duration)
+            return orchestrator.chain_id, {
+                'name': chain_name,
+                'status': 'success',
+                'duration': chain_duration
+            }
+                
+        except Exception as e:
+            logger.error("❌ Failed to analyze %s (ID: %s): %s", chain_name, orchestrator.chain_id, e)
+            chain_duration = time.time() - chain_start_time
+            return orchestrator.chain_id, {
+                'name': chain_name,
+                'status': 'failed',
+                'duration': chain_duration,
+                'error': str(e)
+            }
\ No newline at end of file
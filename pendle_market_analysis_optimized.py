@@ -33,6 +33,7 @@ from pendle_market_analysis.enhanced_analyzer import EnhancedPendleAnalyzer  # U
 from pendle_market_analysis.enhanced_analyzer import SmartBatchProcessor  # Use smart batch processor
 from pendle_market_analysis.notifier import Notifier
 from pendle_market_analysis.orchestrator import AnalysisOrchestrator
+from pendle_market_analysis.main import configure_logging, install_uvloop
 
 
 class OptimizedPendleAnalyzer:
@@ -48,6 +49,21 @@ class OptimizedPendleAnalyzer:
         # Create the new orchestrator which handles everything
         self.orchestrator = AnalysisOrchestrator(chain_id, cache_duration_hours)
         
+        # Legacy method names bound directly to their new homes (no wrapper frame per call)
+        api_client = self.orchestrator.api_client
+        analyzer = self.orchestrator.analyzer
+        notifier = self.orchestrator.notifier
+        self.get_active_markets_optimized = api_client.get_active_markets
+        self.get_transactions_optimized = api_client.get_transactions
+        self.calculate_current_yt_price_fast = analyzer.calculate_current_yt_price_fast
+        self.calculate_volume_fast = analyzer.calculate_volume_fast
+        self.calculate_average_implied_apy_fast = analyzer.calculate_average_implied_apy_fast
+        self.analyze_market_optimized = self.orchestrator.analyze_single_market
+        self.print_optimized_results = notifier.print_optimized_results
+        self.send_telegram_message = notifier.send_telegram_message
+        self.send_telegram_alerts = notifier.send_telegram_alerts
+        self.run_optimized_analysis = self.orchestrator.run_analysis
+        
         # Legacy compatibility - expose some attributes
         self.TELEGRAM_BOT_TOKEN = os.getenv('TELEGRAM_BOT_TOKEN')
         self.TELEGRAM_CHAT_ID = os.getenv('TELEGRAM_CHAT_ID')
@@ -57,20 +73,11 @@ class OptimizedPendleAnalyzer:
         else:
             print(f"📱 Telegram notifications enabled for chat {self.TELEGRAM_CHAT_ID}")
     
-    # Legacy methods that delegate to the new structure
-    async def fetch_json_optimized(self, session: aiohttp.ClientSession, url: str, 
-                                 params: Dict[str, str], retry_count: int = 0) -> Dict[str, Any]:
-        """Legacy method - delegates to API client"""
-        return await self.orchestrator.api_client.fetch_json_optimized(session, url, params, retry_count)
-    
-    async def get_active_markets_optimized(self, session: aiohttp.ClientSession) -> List[Market]:
-        """Legacy method - delegates to API client"""
-        return await self.orchestrator.api_client.get_active_markets(session)
-    
-    async def get_transactions_optimized(self, session: aiohttp.ClientSession, 
-                                       market_addr: str) -> List[Transaction]:
-        """Legacy method - delegates to API client"""
-        return await self.orchestrator.api_client.get_transactions(session, market_addr)
+    # Legacy methods that map straight onto the new structure
+    def fetch_json_optimized(self, session: aiohttp.ClientSession, url: str,
+                             params: Dict[str, str], retry_count: int = 0):
+        """Legacy method - returns the API client's request coroutine (retries are handled there)"""
+        return self.orchestrator.api_client._make_request_with_retry(session, url, params)
     
     def calculate_decline_rates_fast(self, transactions: List[Transaction]) -> Tuple[float, float, float]:
         """Legacy method - delegates to analyzer"""
@@ -78,35 +85,6 @@ class OptimizedPendleAnalyzer:
         # Return 3 values as expected by legacy code
         return avg_decline, latest_decline, avg_decline  # Use avg_decline as third value
     
-    def calculate_current_yt_price_fast(self, transactions: List[Transaction]) -> float:
-        """Legacy method - delegates to analyzer"""
-        return self.orchestrator.analyzer.calculate_current_yt_price_fast(transactions)
-    
-    def calculate_volume_fast(self, transactions: List[Transaction]) -> float:
-        """Legacy method - delegates to analyzer"""
-        return self.orchestrator.analyzer.calculate_volume_fast(transactions)
-    
-    def calculate_average_implied_apy_fast(self, transactions: List[Transaction]) -> float:
-        """Legacy method - delegates to analyzer"""
-        return self.orchestrator.analyzer.calculate_average_implied_apy_fast(transactions)
-    
-    async def analyze_market_optimized(self, session: aiohttp.ClientSession, 
-                                     market: Market, index: int, total: int) -> DeclineRateAnalysis:
-        """Legacy method - delegates to orchestrator"""
-        return await self.orchestrator.analyze_single_market(session, market, index, total)
-    
-    def print_optimized_results(self, analysis_results: List[DeclineRateAnalysis], active_markets_count: int):
-        """Legacy method - delegates to notifier"""
-        return self.orchestrator.notifier.print_optimized_results(analysis_results, active_markets_count)
-    
-    async def send_telegram_message(self, message: str) -> bool:
-        """Legacy method - delegates to notifier"""
-        return await self.orchestrator.notifier.send_telegram_message(message)
-    
-    async def send_telegram_alerts(self, alert_markets: List[DeclineRateAnalysis]) -> None:
-        """Legacy method - delegates to notifier"""
-        return await self.orchestrator.notifier.send_telegram_alerts(alert_markets)
-    
     # Legacy convenience properties for compatibility
     @property
     def chain_name(self):
@@ -115,11 +93,6 @@ class OptimizedPendleAnalyzer:
     @property
     def CHAINS(self):
         return self.orchestrator.api_client.CHAINS
-    
-    # Main legacy method that delegates to the new structure
-    async def run_optimized_analysis(self):
-        """Legacy method - delegates to orchestrator"""
-        await self.orchestrator.run_analysis()
 
 
 # Legacy convenience functions for direct compatibility
@@ -168,6 +141,8 @@ async def main():
 
 
 if __name__ == "__main__":
+    configure_logging()
+    install_uvloop()
     try:
         asyncio.run(main())
     except KeyboardInterrupt: